@@ -0,0 +1,367 @@
+"""
+End-to-end load test for the trucking API.
+
+Starts a stub routing server and the Django app under gunicorn against a
+throwaway SQLite database, then drives a weighted mix of requests at rising
+concurrency. Latency percentiles, throughput and error rate per endpoint are
+printed and written to a JSON summary that later runs can be compared with.
+
+    python -m loadtest --concurrency 1,8,32 --stage-seconds 20
+    python -m loadtest --compare loadtest-results/summary-<previous>.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from . import stub_ors
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Starting points for generated routes, [lon, lat]
+CITIES = [
+    [-118.243683, 34.052235],  # Los Angeles
+    [-117.161084, 32.715738],  # San Diego
+    [-121.4944, 38.5816],      # Sacramento
+    [-112.074036, 33.448376],  # Phoenix
+    [-115.139830, 36.169941],  # Las Vegas
+    [-122.419418, 37.774929],  # San Francisco
+    [-104.990251, 39.739236],  # Denver
+    [-96.796988, 32.776664],   # Dallas
+    [-87.629798, 41.878114],   # Chicago
+    [-74.005974, 40.712776],   # New York
+]
+
+STATUSES = ['driving', 'on_duty', 'off_duty', 'sleeper_berth']
+
+
+def _calculate_route(rng):
+    current, pickup, dropoff = rng.sample(CITIES, 3)
+    return 'POST', '/api/trips/calculate_route/', {
+        'current_location': current,
+        'pickup_location': pickup,
+        'dropoff_location': dropoff,
+    }
+
+
+def _status_log_post(rng):
+    return 'POST', '/api/status-logs/', {
+        'status': rng.choice(STATUSES),
+        'time': datetime.now().isoformat(),
+    }
+
+
+def _status_log_list(rng):
+    return 'GET', '/api/status-logs/', None
+
+
+def _dashboard(rng):
+    return 'GET', f"/api/daily-logs/?date={datetime.now().date().isoformat()}", None
+
+
+def _trips(rng):
+    return 'GET', '/api/trips/', None
+
+
+def _daily_report(rng):
+    return 'GET', '/api/daily-logs/generate_report/', None
+
+
+# name: (request factory, default weight)
+ENDPOINTS = {
+    'calculate_route': (_calculate_route, 1),
+    'status_log_post': (_status_log_post, 4),
+    'status_log_list': (_status_log_list, 4),
+    'dashboard': (_dashboard, 3),
+    'trips': (_trips, 2),
+    'daily_report': (_daily_report, 1),
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Port {port} did not open within {timeout}s")
+
+
+def _wait_for(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    index = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def _request(base_url, method, path, body, timeout):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(
+        base_url + path,
+        data=data,
+        method=method,
+        headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError, socket.timeout):
+        return None
+
+
+def run_stage(base_url, concurrency, seconds, weights, timeout, seed):
+    """Run `concurrency` virtual users for `seconds`; returns raw samples"""
+    names = [name for name in ENDPOINTS if weights.get(name, 0) > 0]
+    name_weights = [weights[name] for name in names]
+    samples = []
+    stop_at = time.perf_counter() + seconds
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, name_weights)[0]
+            method, path, body = ENDPOINTS[name][0](rng)
+            start = time.perf_counter()
+            status = _request(base_url, method, path, body, timeout)
+            samples.append((name, time.perf_counter() - start, status))
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    """Per-endpoint and overall latency/throughput/error stats"""
+    grouped = {}
+    for name, latency, status in samples:
+        grouped.setdefault(name, []).append((latency, status))
+    grouped['all'] = [(latency, status) for _, latency, status in samples]
+
+    summary = {}
+    for name, rows in sorted(grouped.items()):
+        latencies = sorted(latency * 1000 for latency, _ in rows)
+        errors = sum(1 for _, status in rows if status is None or status >= 500)
+        client_errors = sum(1 for _, status in rows if status is not None and 400 <= status < 500)
+        summary[name] = {
+            'requests': len(rows),
+            'throughput_rps': len(rows) / elapsed if elapsed else 0,
+            'error_rate': errors / len(rows) if rows else 0,
+            'client_error_rate': client_errors / len(rows) if rows else 0,
+            'p50_ms': _percentile(latencies, 50),
+            'p95_ms': _percentile(latencies, 95),
+            'p99_ms': _percentile(latencies, 99),
+            'max_ms': latencies[-1] if latencies else None,
+        }
+    return summary
+
+
+def _format_ms(value):
+    return f"{value:.1f}" if value is not None else '-'
+
+
+def print_stage(concurrency, stats, baseline=None):
+    print(f"\nconcurrency {concurrency}")
+    print(f"  {'endpoint':<17} {'reqs':>7} {'rps':>8} {'err%':>6} {'4xx%':>6} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}" + ('   p95 vs base' if baseline else ''))
+    for name, row in stats.items():
+        line = (f"  {name:<17} {row['requests']:>7} {row['throughput_rps']:>8.1f} "
+                f"{row['error_rate'] * 100:>6.1f} {row['client_error_rate'] * 100:>6.1f} "
+                f"{_format_ms(row['p50_ms']):>9} {_format_ms(row['p95_ms']):>9} "
+                f"{_format_ms(row['p99_ms']):>9}")
+        base = (baseline or {}).get(name)
+        if base and base.get('p95_ms') and row['p95_ms']:
+            line += f"   {(row['p95_ms'] / base['p95_ms'] - 1) * 100:+.0f}%"
+        print(line)
+
+
+def _parse_weights(value):
+    weights = {name: weight for name, (_, weight) in ENDPOINTS.items()}
+    if value:
+        for item in value.split(','):
+            name, _, weight = item.partition('=')
+            if name not in ENDPOINTS:
+                raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}'")
+            weights[name] = float(weight)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m loadtest',
+        description="Load test the trucking API against a local stub routing server."
+    )
+    parser.add_argument('--concurrency', default='1,4,16,64',
+                        help="Comma separated virtual user counts, one stage each")
+    parser.add_argument('--stage-seconds', type=float, default=20)
+    parser.add_argument('--mix', type=_parse_weights, default=_parse_weights(''),
+                        help="Endpoint weights, e.g. calculate_route=2,daily_report=0 "
+                             f"(endpoints: {', '.join(ENDPOINTS)})")
+    parser.add_argument('--request-timeout', type=float, default=60)
+    parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument('--threads', type=int, default=1, help="gunicorn threads per worker")
+    parser.add_argument('--worker-class', default='sync',
+                        help="gunicorn worker class, e.g. gthread or uvicorn.workers.UvicornWorker "
+                             "(the latter serves trucking_app.asgi)")
+    parser.add_argument('--database-url', default=None,
+                        help="Database to test against (default: throwaway SQLite file)")
+    parser.add_argument('--target', default=None,
+                        help="Load an already running server at this URL instead of starting one")
+    parser.add_argument('--output', default=None,
+                        help="Summary JSON path (default: loadtest-results/summary-<timestamp>.json)")
+    parser.add_argument('--compare', default=None,
+                        help="Previous summary JSON to compare p95 latencies with")
+    parser.add_argument('--seed', type=int, default=1)
+    stub_ors.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    concurrency_levels = [int(level) for level in args.concurrency.split(',')]
+    processes = []
+    workdir = tempfile.mkdtemp(prefix='trucking-loadtest-')
+
+    def shutdown(*_):
+        for process in processes:
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    try:
+        if args.target:
+            base_url = args.target.rstrip('/')
+        else:
+            stub_port = _free_port()
+            processes.append(subprocess.Popen([
+                sys.executable, '-m', 'loadtest.stub_ors',
+                '--port', str(stub_port),
+                '--latency-ms', str(args.latency_ms),
+                '--jitter-ms', str(args.jitter_ms),
+                '--failure-rate', str(args.failure_rate),
+                '--route-points', str(args.route_points),
+                '--steps-per-leg', str(args.steps_per_leg),
+            ], cwd=BACKEND_DIR))
+
+            env = dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE='trucking_app.settings',
+                LOADTEST_DATABASE_URL=args.database_url or f"sqlite:///{workdir}/db.sqlite3",
+                ROUTE_MATRIX_DIR=f"{workdir}/matrix_store",
+                OPENROUTESERVICE_API_KEY='stub',
+                OPENROUTESERVICE_BASE_URL=f"http://127.0.0.1:{stub_port}",
+            )
+            _wait_for_port(stub_port)
+            subprocess.run(
+                [sys.executable, 'manage.py', 'migrate', '--noinput', '-v', '0'],
+                cwd=BACKEND_DIR, env=env, check=True
+            )
+
+            app_port = _free_port()
+            app = 'trucking_app.asgi:application' if 'uvicorn' in args.worker_class.lower() \
+                else 'trucking_app.wsgi:application'
+            processes.append(subprocess.Popen([
+                sys.executable, '-m', 'gunicorn', app,
+                '--bind', f"127.0.0.1:{app_port}",
+                '--workers', str(args.workers),
+                '--threads', str(args.threads),
+                '--worker-class', args.worker_class,
+                '--timeout', str(int(args.request_timeout) + 30),
+                '--log-level', 'warning',
+            ], cwd=BACKEND_DIR, env=env))
+
+            base_url = f"http://127.0.0.1:{app_port}"
+            _wait_for(base_url + '/api/trips/')
+
+        baseline = {}
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = {stage['concurrency']: stage['endpoints'] for stage in json.load(f)['stages']}
+
+        stages = []
+        for concurrency in concurrency_levels:
+            samples, elapsed = run_stage(
+                base_url, concurrency, args.stage_seconds, args.mix,
+                args.request_timeout, args.seed
+            )
+            stats = summarize(samples, elapsed)
+            print_stage(concurrency, stats, baseline.get(concurrency))
+            stages.append({
+                'concurrency': concurrency,
+                'elapsed_seconds': elapsed,
+                'endpoints': stats,
+            })
+
+        summary = {
+            'generated_at': datetime.now().isoformat(),
+            'config': {
+                'target': args.target,
+                'workers': args.workers,
+                'threads': args.threads,
+                'worker_class': args.worker_class,
+                'database': 'custom' if args.database_url else 'sqlite',
+                'stage_seconds': args.stage_seconds,
+                'mix': args.mix,
+                'stub_latency_ms': args.latency_ms,
+                'stub_jitter_ms': args.jitter_ms,
+                'stub_failure_rate': args.failure_rate,
+                'stub_route_points': args.route_points,
+                'seed': args.seed,
+            },
+            'stages': stages,
+        }
+
+        output = Path(args.output) if args.output else (
+            Path('loadtest-results') / f"summary-{datetime.now():%Y%m%d-%H%M%S}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(summary, indent=2))
+        print(f"\nSummary written to {output}")
+    finally:
+        shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Minimal OpenRouteService stand-in for offline load tests.
+
+Answers the directions (geojson) and matrix endpoints used by the app with
+straight-line geometry, after a configurable delay, and fails a configurable
+fraction of requests with a 500.
+
+    python -m loadtest.stub_ors --port 8090 --latency-ms 150 --failure-rate 0.01
+"""
+import argparse
+import json
+import math
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+AVERAGE_SPEED_KMH = 80
+ROAD_FACTOR = 1.25
+
+
+def _distance_m(a, b):
+    """Haversine distance between two [lon, lat] points, scaled for roads"""
+    lon1, lat1, lon2, lat2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * 6371000 * math.asin(math.sqrt(h)) * ROAD_FACTOR
+
+
+def _duration_s(distance_m):
+    return distance_m / (AVERAGE_SPEED_KMH / 3.6)
+
+
+def directions_response(coordinates, route_points, steps_per_leg):
+    legs = list(zip(coordinates, coordinates[1:]))
+    points_per_leg = max(route_points // max(len(legs), 1), 2)
+
+    geometry = [list(coordinates[0])]
+    segments = []
+    way_points = [0]
+    total_distance = 0
+    for a, b in legs:
+        start_index = len(geometry) - 1
+        for k in range(1, points_per_leg + 1):
+            t = k / points_per_leg
+            geometry.append([
+                round(a[0] + (b[0] - a[0]) * t, 6),
+                round(a[1] + (b[1] - a[1]) * t, 6),
+            ])
+        distance = _distance_m(a, b)
+        total_distance += distance
+        per_step = max(points_per_leg // steps_per_leg, 1)
+        segments.append({
+            'distance': distance,
+            'duration': _duration_s(distance),
+            'steps': [{
+                'distance': distance / steps_per_leg,
+                'duration': _duration_s(distance) / steps_per_leg,
+                'type': 0,
+                'instruction': f"Continue for {distance / steps_per_leg / 1000:.1f} km",
+                'name': '-',
+                'way_points': [
+                    start_index + i * per_step,
+                    min(start_index + (i + 1) * per_step, len(geometry) - 1),
+                ],
+            } for i in range(steps_per_leg)],
+        })
+        way_points.append(len(geometry) - 1)
+
+    lons = [c[0] for c in geometry]
+    lats = [c[1] for c in geometry]
+    return {
+        'type': 'FeatureCollection',
+        'bbox': [min(lons), min(lats), max(lons), max(lats)],
+        'features': [{
+            'type': 'Feature',
+            'bbox': [min(lons), min(lats), max(lons), max(lats)],
+            'properties': {
+                'segments': segments,
+                'summary': {'distance': total_distance, 'duration': _duration_s(total_distance)},
+                'way_points': way_points,
+            },
+            'geometry': {'type': 'LineString', 'coordinates': geometry},
+        }],
+        'metadata': {'attribution': 'stub'},
+    }
+
+
+def matrix_response(locations, sources, destinations):
+    sources = sources if sources is not None else list(range(len(locations)))
+    destinations = destinations if destinations is not None else list(range(len(locations)))
+    distances = [
+        [_distance_m(locations[i], locations[j]) for j in destinations]
+        for i in sources
+    ]
+    return {
+        'distances': distances,
+        'durations': [[_duration_s(d) for d in row] for row in distances],
+    }
+
+
+def make_handler(config):
+    class StubORSHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+
+            latency = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+            time.sleep(max(latency, 0) / 1000)
+
+            if random.random() < config.failure_rate:
+                self._send(500, {'error': {'code': 2099, 'message': 'Stub failure'}})
+                return
+
+            if self.path.startswith('/v2/directions/'):
+                self._send(200, directions_response(
+                    payload['coordinates'], config.route_points, config.steps_per_leg
+                ))
+            elif self.path.startswith('/v2/matrix/'):
+                self._send(200, matrix_response(
+                    payload['locations'], payload.get('sources'), payload.get('destinations')
+                ))
+            else:
+                self._send(404, {'error': f'Unknown endpoint {self.path}'})
+
+    return StubORSHandler
+
+
+def add_arguments(parser):
+    parser.add_argument('--latency-ms', type=float, default=150,
+                        help="Mean response delay of the stub routing server")
+    parser.add_argument('--jitter-ms', type=float, default=50,
+                        help="Uniform +/- jitter added to the delay")
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help="Fraction of routing requests answered with HTTP 500")
+    parser.add_argument('--route-points', type=int, default=2000,
+                        help="Number of geometry points per route")
+    parser.add_argument('--steps-per-leg', type=int, default=20,
+                        help="Instruction steps per route leg")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    add_arguments(parser)
+    config = parser.parse_args()
+
+    server = ThreadingHTTPServer((config.host, config.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"Stub ORS listening on http://{config.host}:{config.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
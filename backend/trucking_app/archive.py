@@ -0,0 +1,261 @@
+import os
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from .models import StatusLog, DailyLog, ArchiveSegment
+
+
+EPOCH = datetime(1970, 1, 1)
+STATUS_CODES = [code for code, _ in StatusLog.STATUS_CHOICES]
+DAILY_LOG_HOURS = ['driving_hours', 'on_duty_hours', 'off_duty_hours', 'sleeper_berth_hours']
+DAILY_LOG_FLOATS = DAILY_LOG_HOURS + ['total_miles', 'cumulative_mileage']
+
+
+# Column encoding
+
+def _to_us(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_us(us):
+    return EPOCH + timedelta(microseconds=int(us))
+
+
+def _segment_path(kind, month):
+    return Path(settings.ARCHIVE_DIR) / kind / f"{month:%Y-%m}.npz"
+
+
+def _write_segment(path, columns):
+    """Write columns to a compressed .npz, replacing any previous file atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **columns)
+    os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=32)
+def _load_columns(path, mtime):
+    # mtime is part of the cache key so rewritten segments are reloaded
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _read_segment(segment):
+    path = Path(settings.ARCHIVE_DIR) / segment.path
+    return _load_columns(str(path), os.stat(path).st_mtime_ns)
+
+
+def _encode_status_logs(rows):
+    """
+    Status logs as columns sorted by start time. Start times are stored as
+    deltas and end times as durations; both compress far better than raw
+    timestamps.
+    """
+    rows = sorted(rows, key=lambda row: row['time'])
+    starts = np.array([_to_us(row['time']) for row in rows], dtype=np.int64)
+    return {
+        'id': np.array([row['id'] for row in rows], dtype=np.int64),
+        'status': np.array([STATUS_CODES.index(row['status']) for row in rows], dtype=np.uint8),
+        'time_delta': np.diff(starts, prepend=0),
+        'duration': np.array(
+            [_to_us(row['end_time']) for row in rows], dtype=np.int64
+        ) - starts,
+    }
+
+
+def _decode_status_logs(columns, mask=None):
+    starts = np.cumsum(columns['time_delta'])
+    ends = starts + columns['duration']
+    indexes = np.flatnonzero(mask) if mask is not None else range(len(starts))
+    return [{
+        'id': int(columns['id'][i]),
+        'status': STATUS_CODES[columns['status'][i]],
+        'time': _from_us(starts[i]),
+        'end_time': _from_us(ends[i]),
+    } for i in indexes]
+
+
+def _encode_daily_logs(rows):
+    rows = sorted(rows, key=lambda row: row['date'])
+    offsets = np.cumsum([0] + [len(row['trip']) for row in rows])
+    columns = {
+        'id': np.array([row['id'] for row in rows], dtype=np.int64),
+        'date': np.array([row['date'].toordinal() for row in rows], dtype=np.int32),
+        'trip_offsets': offsets.astype(np.int64),
+        'trip_ids': np.array([t for row in rows for t in row['trip']], dtype=np.int64),
+    }
+    for field in DAILY_LOG_FLOATS:
+        columns[field] = np.array([row[field] for row in rows], dtype=np.float64)
+    return columns
+
+
+def _decode_daily_logs(columns, mask=None):
+    indexes = np.flatnonzero(mask) if mask is not None else range(len(columns['id']))
+    offsets = columns['trip_offsets']
+    rows = []
+    for i in indexes:
+        row = {
+            'id': int(columns['id'][i]),
+            'date': date.fromordinal(int(columns['date'][i])),
+            'trip': [int(t) for t in columns['trip_ids'][offsets[i]:offsets[i + 1]]],
+        }
+        for field in DAILY_LOG_FLOATS:
+            row[field] = float(columns[field][i])
+        rows.append(row)
+    return rows
+
+
+# Archiving
+
+def _month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def _store_segment(kind, month, rows, encode, decode, span):
+    """Merge rows into the month's segment (deduplicated by id) and index it"""
+    segment = ArchiveSegment.objects.select_for_update().filter(kind=kind, month=month).first()
+    merged = {row['id']: row for row in (decode(_read_segment(segment)) if segment else [])}
+    merged.update({row['id']: row for row in rows})
+    merged = list(merged.values())
+
+    # The new file is visible before the caller's transaction commits. If
+    # deleting the hot rows then fails, readers skip archived copies of rows
+    # still in the hot table, and the next run merges them again by id.
+    path = _segment_path(kind, month)
+    _write_segment(path, encode(merged))
+    min_time, max_time = span(merged)
+    ArchiveSegment.objects.update_or_create(
+        kind=kind,
+        month=month,
+        defaults={
+            'path': str(path.relative_to(settings.ARCHIVE_DIR)),
+            'row_count': len(merged),
+            'min_time': min_time,
+            'max_time': max_time,
+            'updated_at': datetime.now(),
+        }
+    )
+
+
+def archive_status_logs(cutoff):
+    """Move closed status logs that ended before `cutoff` into monthly segments"""
+    closed = StatusLog.objects.filter(end_time__isnull=False, end_time__lt=cutoff)
+    archived = 0
+    for month in closed.dates('time', 'month'):
+        next_month = _month_start(month + timedelta(days=32))
+        with transaction.atomic():
+            rows = list(closed.filter(
+                time__gte=datetime.combine(month, time.min),
+                time__lt=datetime.combine(next_month, time.min),
+            ).values('id', 'status', 'time', 'end_time'))
+            if not rows:
+                continue
+            _store_segment(
+                'status_log', month, rows,
+                _encode_status_logs, _decode_status_logs,
+                lambda merged: (
+                    min(row['time'] for row in merged),
+                    max(row['end_time'] for row in merged),
+                )
+            )
+            StatusLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            archived += len(rows)
+    return archived
+
+
+def archive_daily_logs(cutoff_date):
+    """Move daily logs dated before `cutoff_date` into monthly segments"""
+    old_logs = DailyLog.objects.filter(date__lt=cutoff_date)
+    archived = 0
+    for month in old_logs.dates('date', 'month'):
+        next_month = _month_start(month + timedelta(days=32))
+        with transaction.atomic():
+            rows = list(old_logs.filter(
+                date__gte=month, date__lt=next_month
+            ).values('id', 'date', *DAILY_LOG_FLOATS))
+            if not rows:
+                continue
+            trips = {}
+            for log_id, trip_id in DailyLog.trip.through.objects.filter(
+                dailylog_id__in=[row['id'] for row in rows]
+            ).values_list('dailylog_id', 'trip_id'):
+                trips.setdefault(log_id, []).append(trip_id)
+            for row in rows:
+                row['trip'] = trips.get(row['id'], [])
+
+            _store_segment(
+                'daily_log', month, rows,
+                _encode_daily_logs, _decode_daily_logs,
+                lambda merged: (
+                    datetime.combine(min(row['date'] for row in merged), time.min),
+                    datetime.combine(max(row['date'] for row in merged) + timedelta(days=1), time.min),
+                )
+            )
+            DailyLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            archived += len(rows)
+    return archived
+
+
+def archive_older_than(days):
+    """Archive status logs and daily logs older than `days` days"""
+    if days < settings.ARCHIVE_MIN_HORIZON_DAYS:
+        raise ValueError(
+            f"Archive horizon must be at least {settings.ARCHIVE_MIN_HORIZON_DAYS} days "
+            "so the hours-of-service window stays in the hot tables"
+        )
+    cutoff_date = datetime.now().date() - timedelta(days=days)
+    return {
+        'status_logs': archive_status_logs(datetime.combine(cutoff_date, time.min)),
+        'daily_logs': archive_daily_logs(cutoff_date),
+    }
+
+
+# Reading
+
+def archived_status_logs(start, end):
+    """Archived status logs overlapping [start, end), sorted by start time"""
+    rows = []
+    for segment in ArchiveSegment.objects.filter(
+        kind='status_log', min_time__lt=end, max_time__gt=start
+    ):
+        columns = _read_segment(segment)
+        starts = np.cumsum(columns['time_delta'])
+        ends = starts + columns['duration']
+        mask = (starts < _to_us(end)) & (ends > _to_us(start))
+        rows.extend(_decode_status_logs(columns, mask))
+    return sorted(rows, key=lambda row: row['time'])
+
+
+def archived_daily_logs(start_date, end_date):
+    """Archived daily logs dated between start_date and end_date (inclusive)"""
+    rows = []
+    for segment in ArchiveSegment.objects.filter(
+        kind='daily_log',
+        min_time__lt=datetime.combine(end_date + timedelta(days=1), time.min),
+        max_time__gt=datetime.combine(start_date, time.min),
+    ):
+        columns = _read_segment(segment)
+        mask = (columns['date'] >= start_date.toordinal()) & (columns['date'] <= end_date.toordinal())
+        rows.extend(_decode_daily_logs(columns, mask))
+    return sorted(rows, key=lambda row: (row['date'], row['id']))
+
+
+def latest_archived_daily_log(before_date):
+    """The most recent archived daily log dated before `before_date`, if any"""
+    for segment in ArchiveSegment.objects.filter(
+        kind='daily_log', min_time__lt=datetime.combine(before_date, time.min)
+    ).order_by('-month'):
+        columns = _read_segment(segment)
+        candidates = np.flatnonzero(columns['date'] < before_date.toordinal())
+        if len(candidates):
+            # Rows are sorted by date; the highest id breaks ties like the hot table's ordering
+            latest_date = columns['date'][candidates[-1]]
+            same_day = candidates[columns['date'][candidates] == latest_date]
+            mask = np.zeros(len(columns['id']), dtype=bool)
+            mask[same_day[np.argmax(columns['id'][same_day])]] = True
+            return _decode_daily_logs(columns, mask)[0]
+    return None
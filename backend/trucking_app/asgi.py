@@ -13,4 +13,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'trucking_app.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from .events import sse_application  # noqa: E402  (needs Django set up first)
+
+
+async def application(scope, receive, send):
+    # Live update streams bypass the Django request cycle to stay cheap
+    if scope['type'] == 'http' and scope['path'] == '/api/events/':
+        await sse_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
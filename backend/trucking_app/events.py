@@ -0,0 +1,190 @@
+import asyncio
+import itertools
+import json
+import threading
+from urllib.parse import parse_qs
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from .renderers import ORJSONRenderer
+
+
+TOPICS = ('status', 'daily_log', 'route_job')
+
+
+class Subscription:
+    """A subscriber's queue of pending events, drained by sse_application."""
+
+    def __init__(self, topics, loop, maxsize):
+        self.topics = topics
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _offer(self, event):
+        # Runs on the subscriber's event loop. A consumer that falls too far
+        # behind loses its oldest events rather than holding memory forever.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class InProcessBroker:
+    """
+    Fans events out to subscribers in this process. Publishing is thread
+    safe, so the sync write paths and route job threads can call it while
+    subscribers wait on the ASGI event loop.
+
+    Another broker (e.g. one backed by a local Redis or Postgres
+    LISTEN/NOTIFY) can be used by pointing EVENT_BROKER at a class with the
+    same subscribe/unsubscribe/publish methods.
+    """
+
+    def __init__(self):
+        self._subscribers = {topic: set() for topic in TOPICS}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, topics):
+        subscription = Subscription(
+            topics, asyncio.get_running_loop(), settings.EVENT_QUEUE_SIZE
+        )
+        with self._lock:
+            for topic in topics:
+                self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers[topic].discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._subscribers.values()))
+
+    def publish(self, topic, data):
+        event = {'id': next(self._ids), 'topic': topic, 'data': data}
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.EVENT_BROKER)()
+    return _broker
+
+
+def publish_on_commit(topic, data):
+    """Publish once the current transaction commits (right away in autocommit)"""
+    transaction.on_commit(lambda: get_broker().publish(topic, data))
+
+
+def _cors_headers(scope):
+    headers = dict(scope.get('headers') or [])
+    origin = headers.get(b'origin', b'').decode()
+    if origin and origin in settings.CORS_ALLOWED_ORIGINS:
+        return [
+            (b'access-control-allow-origin', origin.encode()),
+            (b'access-control-allow-credentials', b'true'),
+            (b'vary', b'Origin'),
+        ]
+    return []
+
+
+async def _send_json(send, status, body, extra_headers=()):
+    data = json.dumps(body).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(data)).encode()),
+            *extra_headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': data})
+
+
+async def sse_application(scope, receive, send):
+    """
+    Server-sent events for status changes, daily log updates and route job
+    completions; `?topics=status,route_job` limits the stream to some topics.
+
+    Served straight from the ASGI entry point rather than through a Django
+    view, so an idle subscriber costs only its queue and a suspended task.
+    """
+    cors = _cors_headers(scope)
+    query = parse_qs(scope.get('query_string', b'').decode())
+    topics = [t for t in ','.join(query.get('topics', [])).split(',') if t] or list(TOPICS)
+    unknown = set(topics) - set(TOPICS)
+    if unknown:
+        await _send_json(send, 400, {"error": f"Unknown topics: {', '.join(sorted(unknown))}"}, cors)
+        return
+
+    broker = get_broker()
+    subscription = broker.subscribe(topics)
+    renderer = ORJSONRenderer()
+
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    disconnected = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+                *cors,
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': f"retry: {settings.EVENT_RETRY_MS}\n\n".encode(),
+            'more_body': True,
+        })
+
+        while not disconnected.done():
+            next_event = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected},
+                timeout=settings.EVENT_HEARTBEAT_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if next_event not in done:
+                next_event.cancel()
+                if not done:
+                    # Comment line keeps proxies from closing the idle connection
+                    await send({'type': 'http.response.body', 'body': b': heartbeat\n\n', 'more_body': True})
+                continue
+
+            event = next_event.result()
+            data = renderer.render(event['data']).decode()
+            await send({
+                'type': 'http.response.body',
+                'body': f"id: {event['id']}\nevent: {event['topic']}\ndata: {data}\n\n".encode(),
+                'more_body': True,
+            })
+    except OSError:
+        # Client went away mid-write
+        pass
+    finally:
+        broker.unsubscribe(subscription)
+        disconnected.cancel()
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+from .events import publish_on_commit
+from .models import RouteJob
+from .routing import plan_route
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_last_cleanup = 0
+
+
+class RouteQueueFull(Exception):
+    """Raised when too many route jobs are already waiting."""
+
+
+def payload_key(payload):
+    """Stable hash of a route payload, used to spot identical jobs"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ROUTE_JOB_WORKERS,
+                thread_name_prefix='route-job'
+            )
+            # Pick up jobs a previous process queued but never ran
+            reap_stale_jobs()
+            for job_id in RouteJob.objects.filter(status='pending').order_by(
+                'created_at'
+            ).values_list('id', flat=True):
+                _executor.submit(_run_in_thread, job_id)
+    return _executor
+
+
+def reap_stale_jobs():
+    """
+    Fail jobs older than ROUTE_JOB_TIMEOUT that are stuck: `running` jobs
+    whose thread or process died, and `pending` jobs that were lost in a
+    restart. Returns the number of jobs failed.
+    """
+    now = datetime.now()
+    cutoff = now - timedelta(seconds=settings.ROUTE_JOB_TIMEOUT)
+    interrupted = RouteJob.objects.filter(status='running', started_at__lt=cutoff).update(
+        status='failed',
+        error="Route job was interrupted before it finished.",
+        finished_at=now
+    )
+    expired = RouteJob.objects.filter(status='pending', created_at__lt=cutoff).update(
+        status='failed',
+        error="Route job expired before a worker picked it up.",
+        finished_at=now
+    )
+    return interrupted + expired
+
+
+def prune_finished_jobs():
+    """Delete finished jobs older than ROUTE_JOB_RETENTION_DAYS, with their results"""
+    cutoff = datetime.now() - timedelta(days=settings.ROUTE_JOB_RETENTION_DAYS)
+    deleted, _ = RouteJob.objects.filter(
+        status__in=['done', 'failed'], created_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def _clean_up_periodically():
+    # Runs after each in-process job; does the actual work at most once a minute
+    global _last_cleanup
+    with _executor_lock:
+        if time.monotonic() - _last_cleanup < 60:
+            return
+        _last_cleanup = time.monotonic()
+    reap_stale_jobs()
+    prune_finished_jobs()
+
+
+def enqueue_route_job(payload):
+    """
+    Queue a route calculation. An identical job that is still pending or
+    running is reused instead of creating a new one.
+    Returns (job, created).
+    """
+    key = payload_key(payload)
+    cutoff = datetime.now() - timedelta(seconds=settings.ROUTE_JOB_TIMEOUT)
+
+    in_flight = RouteJob.objects.filter(
+        payload_key=key,
+        status__in=['pending', 'running'],
+        created_at__gte=cutoff
+    ).first()
+    if in_flight:
+        return in_flight, False
+
+    # Older pending rows were lost and are failed by reap_stale_jobs
+    pending = RouteJob.objects.filter(status='pending', created_at__gte=cutoff).count()
+    if pending >= settings.ROUTE_JOB_MAX_PENDING:
+        raise RouteQueueFull("Route job queue is full, try again later.")
+
+    job = RouteJob.objects.create(payload=payload, payload_key=key)
+
+    if settings.ROUTE_JOBS_IN_PROCESS:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.id))
+
+    return job, True
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_route_job(job_id)
+        _clean_up_periodically()
+    finally:
+        close_old_connections()
+
+
+def claim_job(job_id):
+    """Atomically move a pending job to running. Returns True if we got it."""
+    return RouteJob.objects.filter(id=job_id, status='pending').update(
+        status='running',
+        started_at=datetime.now()
+    ) == 1
+
+
+def claim_next_job():
+    """Claim the oldest pending job, or return None if the queue is empty"""
+    while True:
+        job_id = RouteJob.objects.filter(status='pending').order_by(
+            'created_at'
+        ).values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        if claim_job(job_id):
+            return job_id
+
+
+def run_route_job(job_id, claimed=False):
+    """Execute a route job and store its result or error"""
+    if not claimed and not claim_job(job_id):
+        return
+
+    job = RouteJob.objects.get(id=job_id)
+    try:
+        job.result = plan_route(
+            job.payload['current_location'],
+            job.payload['pickup_location'],
+            job.payload['dropoff_location']
+        )
+        job.status = 'done'
+    except Exception as e:
+        job.error = str(e)
+        job.status = 'failed'
+    job.finished_at = datetime.now()
+    job.save(update_fields=['result', 'error', 'status', 'finished_at'])
+
+    publish_on_commit('route_job', {
+        'job_id': job.id,
+        'status': job.status,
+        'error': job.error,
+        'duration_seconds': job.duration_seconds,
+    })
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def job_metrics(window=500):
+    """Queue depth and duration stats over the most recent finished jobs"""
+    counts = {choice: 0 for choice, _ in RouteJob.STATUS_CHOICES}
+    for row in RouteJob.objects.values('status').annotate(
+        total=Count('id')
+    ).order_by():
+        counts[row['status']] = row['total']
+
+    finished = list(RouteJob.objects.filter(
+        status__in=['done', 'failed']
+    ).order_by('-finished_at').values_list(
+        'created_at', 'started_at', 'finished_at'
+    )[:window])
+
+    run_times = sorted(
+        (end - start).total_seconds() for _, start, end in finished if start and end
+    )
+    wait_times = sorted(
+        (start - created).total_seconds() for created, start, _ in finished if start
+    )
+
+    return {
+        'counts': counts,
+        'workers': settings.ROUTE_JOB_WORKERS,
+        'sample_size': len(run_times),
+        'duration_seconds': {
+            'avg': sum(run_times) / len(run_times) if run_times else None,
+            'p50': _percentile(run_times, 50),
+            'p95': _percentile(run_times, 95),
+            'max': run_times[-1] if run_times else None,
+        },
+        'queue_wait_seconds': {
+            'avg': sum(wait_times) / len(wait_times) if wait_times else None,
+            'p95': _percentile(wait_times, 95),
+        },
+    }
+
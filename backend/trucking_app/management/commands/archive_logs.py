@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from trucking_app.archive import archive_older_than
+
+
+class Command(BaseCommand):
+    help = "Move old status logs and daily logs out of the database into compressed monthly archive files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-days', type=int, default=settings.ARCHIVE_HORIZON_DAYS,
+            help="Archive logs older than this many days"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            archived = archive_older_than(options['horizon_days'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            f"Archived {archived['status_logs']} status log(s) "
+            f"and {archived['daily_logs']} daily log(s)"
+        )
@@ -0,0 +1,134 @@
+import gzip
+import random
+import statistics
+import time
+import brotli
+import folium
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from trucking_app.renderers import ORJSONRenderer, MessagePackRenderer
+from trucking_app.routing import with_polyline_geometry
+
+
+ROUTE_SIZES = {
+    # name: (coordinates, instruction steps)
+    'small': (400, 25),
+    'cross_country': (60000, 1200),
+}
+
+
+def _fake_route_payload(n_coords, n_steps, seed=0):
+    """
+    Build a calculate_route-shaped payload with a random walk from Los
+    Angeles towards New York, similar in shape to an ORS geojson response.
+    """
+    rng = random.Random(seed)
+    lon, lat = -118.243683, 34.052235
+    step_lon = (-74.0060 - lon) / n_coords
+    step_lat = (40.7128 - lat) / n_coords
+    coords = []
+    for _ in range(n_coords):
+        lon += step_lon + rng.uniform(-0.002, 0.002)
+        lat += step_lat + rng.uniform(-0.002, 0.002)
+        coords.append([round(lon, 6), round(lat, 6)])
+
+    per_step = max(n_coords // n_steps, 1)
+    steps = [{
+        'distance': round(rng.uniform(50, 20000), 1),
+        'duration': round(rng.uniform(5, 900), 1),
+        'type': rng.randint(0, 13),
+        'instruction': f"Turn right onto Interstate {rng.randint(5, 95)}",
+        'name': f"I {rng.randint(5, 95)}",
+        'way_points': [i * per_step, min((i + 1) * per_step, n_coords - 1)],
+    } for i in range(n_steps)]
+
+    distance = n_coords * 80.0
+    duration = distance / 25.0
+    route = {
+        'type': 'FeatureCollection',
+        'bbox': [min(c[0] for c in coords), min(c[1] for c in coords),
+                 max(c[0] for c in coords), max(c[1] for c in coords)],
+        'features': [{
+            'type': 'Feature',
+            'bbox': None,
+            'properties': {
+                'segments': [{'distance': distance, 'duration': duration, 'steps': steps}],
+                'summary': {'distance': distance, 'duration': duration},
+                'way_points': [0, n_coords // 3, n_coords - 1],
+            },
+            'geometry': {'type': 'LineString', 'coordinates': coords},
+        }],
+        'metadata': {'attribution': 'openrouteservice.org | OpenStreetMap contributors'},
+    }
+
+    m = folium.Map(location=[coords[0][1], coords[0][0]], zoom_start=12, tiles='cartodbpositron')
+    folium.GeoJson(route, name='Route').add_to(m)
+
+    waypoints = [coords[0], coords[n_coords // 3], coords[-1]]
+    rest_every = max(n_coords // max(int(duration / 3600 / 4), 1), 1)
+    return {
+        'route_geojson': route,
+        'total_distance_km': distance / 1000,
+        'total_duration_hours': duration / 3600,
+        'waypoints': waypoints,
+        'rest_stops': [
+            {'location': coords[i], 'distance_km': i * 0.08}
+            for i in range(rest_every, n_coords, rest_every)
+        ],
+        'map_html': m._repr_html_(),
+        'trip_id': 1,
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare response size and serialization time per renderer and geometry encoding"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help="Number of timed renders per format (median is reported)"
+        )
+        parser.add_argument(
+            '--no-map', action='store_true',
+            help="Drop map_html from the payload before rendering"
+        )
+
+    def handle(self, *args, **options):
+        # (name, renderer, polyline geometry, keep map_html)
+        formats = [
+            ('drf-json', JSONRenderer(), False, True),
+            ('orjson', ORJSONRenderer(), False, True),
+            ('orjson+polyline', ORJSONRenderer(), True, True),
+            ('orjson+compact', ORJSONRenderer(), True, False),
+            ('msgpack', MessagePackRenderer(), False, True),
+            ('msgpack+polyline', MessagePackRenderer(), True, True),
+            ('msgpack+compact', MessagePackRenderer(), True, False),
+        ]
+
+        header = f"{'route':<14} {'format':<17} {'bytes':>11} {'ms':>9} {'gzip':>11} {'br':>11}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for route_name, (n_coords, n_steps) in ROUTE_SIZES.items():
+            payload = _fake_route_payload(n_coords, n_steps)
+            if options['no_map']:
+                payload.pop('map_html')
+
+            for format_name, renderer, polyline, keep_map in formats:
+                timings = []
+                for _ in range(max(options['repeat'], 1)):
+                    start = time.perf_counter()
+                    data = with_polyline_geometry(payload) if polyline else payload
+                    if not keep_map:
+                        data = {key: value for key, value in data.items() if key != 'map_html'}
+                    body = renderer.render(data)
+                    timings.append(time.perf_counter() - start)
+
+                gzip_size = len(gzip.compress(body, compresslevel=6))
+                br_size = len(brotli.compress(body, quality=5))
+                self.stdout.write(
+                    f"{route_name:<14} {format_name:<17} {len(body):>11,} "
+                    f"{statistics.median(timings) * 1000:>9.2f} "
+                    f"{gzip_size:>11,} {br_size:>11,}"
+                )
+            self.stdout.write('')
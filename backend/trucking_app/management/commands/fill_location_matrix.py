@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from trucking_app.routing import fill_location_matrix
+
+
+class Command(BaseCommand):
+    help = "Fetch missing durations/distances between registered locations into the matrix store"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-requests', type=int, default=None,
+            help="Stop after this many ORS matrix requests (to stay within quota)"
+        )
+
+    def handle(self, *args, **options):
+        requests_made = fill_location_matrix(max_requests=options['max_requests'])
+        self.stdout.write(f"Made {requests_made} matrix request(s)")
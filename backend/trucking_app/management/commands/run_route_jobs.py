@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from trucking_app.jobs import (
+    claim_next_job,
+    prune_finished_jobs,
+    reap_stale_jobs,
+    run_route_job
+)
+
+
+class Command(BaseCommand):
+    help = "Run queued route calculation jobs from the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.ROUTE_JOB_WORKERS,
+            help="Maximum number of jobs to run at once"
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help="Seconds to wait between polls when the queue is empty"
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit once the queue is empty"
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        self.stdout.write(f"Running route jobs with {workers} worker(s)")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='route-job') as pool:
+            running = set()
+            last_reap = 0
+            while True:
+                if time.monotonic() - last_reap >= 60:
+                    reaped = reap_stale_jobs()
+                    if reaped:
+                        self.stdout.write(f"Failed {reaped} stale route job(s)")
+                    pruned = prune_finished_jobs()
+                    if pruned:
+                        self.stdout.write(f"Deleted {pruned} old route job(s)")
+                    last_reap = time.monotonic()
+
+                running = {f for f in running if not f.done()}
+                if len(running) >= workers:
+                    time.sleep(0.05)
+                    continue
+
+                job_id = claim_next_job()
+                if job_id is None:
+                    if options['once'] and not running:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                running.add(pool.submit(self._run, job_id))
+
+    def _run(self, job_id):
+        close_old_connections()
+        try:
+            run_route_job(job_id, claimed=True)
+            self.stdout.write(f"Finished route job {job_id}")
+        finally:
+            close_old_connections()
@@ -0,0 +1,168 @@
+import fcntl
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+
+
+METRICS = ('duration', 'distance')
+
+
+class MatrixStore:
+    """
+    Persistent driving duration (seconds) and distance (meters) between
+    registered locations.
+
+    Each metric is a square float32 matrix in its own flat file, indexed by
+    Location id, so a lookup is a single array read. Readers memory-map the
+    files and only touch the pages they need. NaN marks a pair that has not
+    been fetched yet and inf a pair with no drivable route.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._readers = {}
+        self._readers_lock = threading.Lock()
+
+    def _path(self, metric):
+        return self.directory / f'{metric}.f32'
+
+    @contextmanager
+    def _write_lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _capacity(size):
+        return int(round((size // 4) ** 0.5))
+
+    def capacity(self):
+        try:
+            return self._capacity(os.stat(self._path(METRICS[0])).st_size)
+        except FileNotFoundError:
+            return 0
+
+    def _reader(self, metric):
+        """Read-only memory map, reopened when the file is grown or replaced"""
+        path = self._path(metric)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        key = (stat.st_ino, stat.st_size)
+        with self._readers_lock:
+            cached = self._readers.get(metric)
+            if cached and cached[0] == key:
+                return cached[1]
+            capacity = self._capacity(stat.st_size)
+            matrix = np.memmap(path, dtype=np.float32, mode='r', shape=(capacity, capacity))
+            self._readers[metric] = (key, matrix)
+            return matrix
+
+    def _grow(self, capacity):
+        """Grow both matrices to at least `capacity` rows. Caller holds the lock."""
+        current = self.capacity()
+        if capacity <= current:
+            return
+        new_capacity = max(capacity, current * 2, 64)
+        for metric in METRICS:
+            tmp_path = self._path(metric).with_suffix('.tmp')
+            grown = np.memmap(tmp_path, dtype=np.float32, mode='w+',
+                              shape=(new_capacity, new_capacity))
+            grown[:] = np.nan
+            np.fill_diagonal(grown, 0)
+            if current:
+                old = np.memmap(self._path(metric), dtype=np.float32, mode='r',
+                                shape=(current, current))
+                grown[:current, :current] = old
+                del old
+            grown.flush()
+            del grown
+            os.replace(tmp_path, self._path(metric))
+
+    def ensure_capacity(self, capacity):
+        with self._write_lock():
+            self._grow(capacity)
+
+    def get(self, origin, destination):
+        """(duration, distance) between two location ids, or None if unknown"""
+        durations = self._reader('duration')
+        # Location ids start at 1; negative ids would wrap around in numpy
+        if durations is None or min(origin, destination) < 1:
+            return None
+        if max(origin, destination) >= durations.shape[0]:
+            return None
+        duration = float(durations[origin, destination])
+        if np.isnan(duration):
+            return None
+        distance = float(self._reader('distance')[origin, destination])
+        return duration, distance
+
+    def submatrix(self, ids):
+        """
+        Duration and distance arrays between the given location ids, with
+        NaN for pairs that are not known.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        result = []
+        for metric in METRICS:
+            block = np.full((len(ids), len(ids)), np.nan, dtype=np.float32)
+            matrix = self._reader(metric)
+            if matrix is not None and len(ids):
+                inside = (ids >= 1) & (ids < matrix.shape[0])
+                rows = ids[inside]
+                block[np.ix_(inside, inside)] = matrix[np.ix_(rows, rows)]
+            result.append(block)
+        return result[0], result[1]
+
+    def set_block(self, sources, destinations, durations, distances):
+        """Store rows of results; None values are stored as unroutable (inf)"""
+        sources = np.asarray(sources, dtype=np.int64)
+        destinations = np.asarray(destinations, dtype=np.int64)
+        values = {
+            'duration': np.array(durations, dtype=np.float64),
+            'distance': np.array(distances, dtype=np.float64),
+        }
+        with self._write_lock():
+            self._grow(int(max(sources.max(), destinations.max())) + 1)
+            capacity = self.capacity()
+            for metric in METRICS:
+                block = np.where(np.isnan(values[metric]), np.inf, values[metric])
+                matrix = np.memmap(self._path(metric), dtype=np.float32, mode='r+',
+                                   shape=(capacity, capacity))
+                matrix[np.ix_(sources, destinations)] = block
+                matrix.flush()
+                del matrix
+
+    def forget(self, location_id):
+        """Mark every pair involving a location as unknown, e.g. after it moved"""
+        with self._write_lock():
+            capacity = self.capacity()
+            if location_id >= capacity:
+                return
+            for metric in METRICS:
+                matrix = np.memmap(self._path(metric), dtype=np.float32, mode='r+',
+                                   shape=(capacity, capacity))
+                matrix[location_id, :] = np.nan
+                matrix[:, location_id] = np.nan
+                matrix[location_id, location_id] = 0
+                matrix.flush()
+                del matrix
+
+
+_store = None
+
+
+def get_matrix_store():
+    global _store
+    if _store is None:
+        _store = MatrixStore(settings.ROUTE_MATRIX_DIR)
+    return _store
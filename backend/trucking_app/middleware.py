@@ -0,0 +1,74 @@
+import gzip
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+import brotli
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+
+_accepts_br = _lazy_re_compile(r'\bbr\b')
+_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+
+
+class CompressionMiddleware:
+    """
+    Brotli or gzip compress large responses, depending on what the client
+    accepts. Small bodies are left alone since compression would not pay
+    for itself.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            # Stay async under ASGI so requests are not bounced through a thread
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < settings.RESPONSE_COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if _accepts_br.search(accept_encoding):
+            compressed = brotli.compress(
+                response.content,
+                quality=settings.RESPONSE_BROTLI_QUALITY
+            )
+            encoding = 'br'
+        elif _accepts_gzip.search(accept_encoding):
+            compressed = gzip.compress(
+                response.content,
+                compresslevel=settings.RESPONSE_GZIP_LEVEL
+            )
+            encoding = 'gzip'
+        else:
+            return response
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+
+        # Weaken strong ETags since the body bytes changed
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        return response
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:48
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trucking_app', '0003_routejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('kind', models.CharField(choices=[('depot', 'Depot'), ('customer', 'Customer'), ('other', 'Other')], default='customer', max_length=20)),
+                ('longitude', models.FloatField()),
+                ('latitude', models.FloatField()),
+                ('coord_key', models.CharField(editable=False, max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(default=datetime.datetime.now)),
+            ],
+        ),
+    ]
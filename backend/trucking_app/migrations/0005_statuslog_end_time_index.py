@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trucking_app', '0004_location'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='statuslog',
+            index=models.Index(fields=['end_time', 'time'], name='statuslog_end_time_idx'),
+        ),
+    ]
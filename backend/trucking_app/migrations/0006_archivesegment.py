@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:58
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trucking_app', '0005_statuslog_end_time_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('status_log', 'Status Log'), ('daily_log', 'Daily Log')], max_length=20)),
+                ('month', models.DateField(help_text='First day of the archived month')),
+                ('path', models.CharField(help_text='Relative to ARCHIVE_DIR', max_length=500)),
+                ('row_count', models.IntegerField(default=0)),
+                ('min_time', models.DateTimeField()),
+                ('max_time', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(default=datetime.datetime.now)),
+            ],
+            options={
+                'ordering': ['kind', 'month'],
+                'indexes': [models.Index(fields=['kind', 'min_time', 'max_time'], name='trucking_ap_kind_060c0a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'month'), name='unique_archive_segment')],
+            },
+        ),
+    ]
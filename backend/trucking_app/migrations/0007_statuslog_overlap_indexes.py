@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:08
+
+from django.db import migrations, models
+from django.db.models import DurationField, ExpressionWrapper, F
+
+
+def backfill_durations(apps, schema_editor):
+    # Long logs are found by duration, so every closed log needs one
+    StatusLog = apps.get_model('trucking_app', 'StatusLog')
+    StatusLog.objects.filter(end_time__isnull=False, duration__isnull=True).update(
+        duration=ExpressionWrapper(F('end_time') - F('time'), output_field=DurationField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trucking_app', '0006_archivesegment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='statuslog',
+            index=models.Index(fields=['time', 'end_time'], name='statuslog_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statuslog',
+            index=models.Index(fields=['duration'], name='statuslog_duration_idx'),
+        ),
+        migrations.RunPython(backfill_durations, migrations.RunPython.noop),
+    ]
@@ -21,6 +21,14 @@ class StatusLog(models.Model):
     
     class Meta:
         ordering = ['-time']
+        indexes = [
+            # Open-status lookup (end_time IS NULL)
+            models.Index(fields=['end_time', 'time'], name='statuslog_end_time_idx'),
+            # Overlap queries: logs that started shortly before a range, and
+            # the few unusually long ones (see timeline.overlapping_status_logs)
+            models.Index(fields=['time', 'end_time'], name='statuslog_time_idx'),
+            models.Index(fields=['duration'], name='statuslog_duration_idx'),
+        ]
         
     def save(self, *args, **kwargs):
         # Automatically calculate duration when end_time is set
@@ -114,3 +122,103 @@ class DailyLog(models.Model):
     
     def __str__(self):
         return f"Daily Log for {self.date}"
+
+
+class RouteJob(models.Model):
+    """
+    Queued route calculation, executed by the local worker pool.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    payload = models.JSONField()
+    # Hash of the payload, used to deduplicate identical in-flight jobs
+    payload_key = models.CharField(max_length=64, db_index=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=datetime.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    @property
+    def duration_seconds(self):
+        if self.started_at and self.finished_at:
+            return (self.finished_at - self.started_at).total_seconds()
+        return None
+
+    def __str__(self):
+        return f"RouteJob {self.id} ({self.status})"
+
+
+class Location(models.Model):
+    """
+    Recurring depot or customer location. Its id is also its row and column
+    in the persistent distance/duration matrix.
+    """
+    KIND_CHOICES = [
+        ('depot', 'Depot'),
+        ('customer', 'Customer'),
+        ('other', 'Other'),
+    ]
+
+    name = models.CharField(max_length=255)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='customer')
+    longitude = models.FloatField()
+    latitude = models.FloatField()
+    # Rounded "lon,lat" used to recognise the location in route requests
+    coord_key = models.CharField(max_length=64, unique=True, editable=False)
+    created_at = models.DateTimeField(default=datetime.now)
+
+    @staticmethod
+    def key_for(longitude, latitude):
+        return '%.5f,%.5f' % (float(longitude), float(latitude))
+
+    def save(self, *args, **kwargs):
+        self.coord_key = self.key_for(self.longitude, self.latitude)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.name} ({self.coord_key})"
+
+
+class ArchiveSegment(models.Model):
+    """
+    Index entry for one compressed archive file holding a month of status
+    logs or daily logs that were moved out of the hot tables.
+    """
+    KIND_CHOICES = [
+        ('status_log', 'Status Log'),
+        ('daily_log', 'Daily Log'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    month = models.DateField(help_text="First day of the archived month")
+    path = models.CharField(max_length=500, help_text="Relative to ARCHIVE_DIR")
+    row_count = models.IntegerField(default=0)
+    # Time span covered by the rows, used to pick segments for a range
+    min_time = models.DateTimeField()
+    max_time = models.DateTimeField()
+    updated_at = models.DateTimeField(default=datetime.now)
+
+    class Meta:
+        ordering = ['kind', 'month']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'month'], name='unique_archive_segment'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'min_time', 'max_time']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} archive for {self.month:%Y-%m}"
@@ -0,0 +1,225 @@
+import math
+import time
+
+
+class StopOrderSolver:
+    """
+    Orders stops for a single truck leaving from node 0.
+
+    Nodes 1..n are stops. `durations[a][b]` is the driving time in seconds
+    from node a to node b, and may be asymmetric. Each stop can have a time
+    window (earliest, latest) in seconds from departure and a service time.
+    `pickup_of` maps a dropoff node to the pickup node that must come first.
+
+    The order is built with nearest insertion and then improved with 2-opt
+    and Or-opt moves until no move helps or the time budget runs out.
+    Pickup-before-dropoff is a hard rule; time windows are kept if possible,
+    otherwise the order with the least total lateness is returned.
+    """
+
+    def __init__(self, durations, service_times=None, time_windows=None,
+                 pickup_of=None, return_to_start=False):
+        self.d = durations
+        self.n = len(durations)
+        self.service = service_times or [0] * self.n
+        self.windows = time_windows or [None] * self.n
+        self.pickup_of = pickup_of or {}
+        self.return_to_start = return_to_start
+
+    # Route helpers. A route is [0, stop, stop, ...] (plus a trailing 0 when
+    # returning to start); only the stops between the depots can move.
+
+    def _last_movable(self, route):
+        return len(route) - 1 if self.return_to_start else len(route)
+
+    def cost(self, route):
+        d = self.d
+        return sum(d[route[k]][route[k + 1]] for k in range(len(route) - 1))
+
+    def schedule(self, route):
+        """Arrival times (seconds from departure) for each node in the route"""
+        arrivals = [0]
+        t = self.service[route[0]]
+        for k in range(1, len(route)):
+            node = route[k]
+            t += self.d[route[k - 1]][node]
+            window = self.windows[node]
+            if window and window[0] is not None and t < window[0]:
+                t = window[0]
+            arrivals.append(t)
+            t += self.service[node]
+        return arrivals
+
+    def lateness(self, route):
+        late = 0
+        t = self.service[route[0]]
+        for k in range(1, len(route)):
+            node = route[k]
+            t += self.d[route[k - 1]][node]
+            window = self.windows[node]
+            if window:
+                if window[0] is not None and t < window[0]:
+                    t = window[0]
+                if window[1] is not None and t > window[1]:
+                    late += t - window[1]
+            t += self.service[node]
+        return late
+
+    def precedence_ok(self, route):
+        if not self.pickup_of:
+            return True
+        position = {node: i for i, node in enumerate(route)}
+        return all(
+            position[pickup] < position[dropoff]
+            for dropoff, pickup in self.pickup_of.items()
+        )
+
+    # Construction
+
+    def initial_route(self):
+        """Nearest insertion, placing each stop at its cheapest allowed position"""
+        d = self.d
+        route = [0, 0] if self.return_to_start else [0]
+        remaining = set(range(1, self.n))
+        nearest = {c: min(d[0][c], d[c][0]) for c in remaining}
+
+        while remaining:
+            candidates = [
+                c for c in remaining
+                if c not in self.pickup_of or self.pickup_of[c] not in remaining
+            ]
+            node = min(candidates, key=lambda c: nearest[c])
+            remaining.discard(node)
+
+            first = route.index(self.pickup_of[node]) + 1 if node in self.pickup_of else 1
+            positions = []
+            for i in range(first, self._last_movable(route) + 1):
+                a = route[i - 1]
+                if i < len(route):
+                    b = route[i]
+                    delta = d[a][node] + d[node][b] - d[a][b]
+                else:
+                    delta = d[a][node]
+                positions.append((delta, i))
+            positions.sort()
+
+            current_late = self.lateness(route)
+            best = None
+            for delta, i in positions:
+                candidate = route[:i] + [node] + route[i:]
+                late = self.lateness(candidate)
+                if late <= current_late:
+                    best = candidate
+                    break
+                if best is None or late < best_late:
+                    best, best_late = candidate, late
+            route = best
+
+            for c in remaining:
+                nearest[c] = min(nearest[c], d[node][c], d[c][node])
+
+        return route
+
+    # Improvement
+
+    def _accept(self, candidate, gain, current_late):
+        """Whether a move with the given travel-time gain should be kept"""
+        if not self.precedence_ok(candidate):
+            return None
+        late = self.lateness(candidate)
+        if late < current_late or (late == current_late and gain > 1e-9):
+            return late
+        return None
+
+    def _two_opt(self, route, late, deadline):
+        d = self.d
+        last = self._last_movable(route)
+        # Prefix sums of forward and backward edge costs along the route
+        fwd = [0.0]
+        bwd = [0.0]
+        for k in range(len(route) - 1):
+            fwd.append(fwd[-1] + d[route[k]][route[k + 1]])
+            bwd.append(bwd[-1] + d[route[k + 1]][route[k]])
+
+        for i in range(1, last - 1):
+            if time.perf_counter() > deadline:
+                return None
+            a = route[i - 1]
+            for j in range(i + 1, last):
+                b = route[i]
+                c = route[j]
+                after = route[j + 1] if j + 1 < len(route) else None
+                old = d[a][b] + (fwd[j] - fwd[i])
+                new = d[a][c] + (bwd[j] - bwd[i])
+                if after is not None:
+                    old += d[c][after]
+                    new += d[b][after]
+                gain = old - new
+                if gain <= 1e-9 and late == 0:
+                    continue
+                candidate = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+                new_late = self._accept(candidate, gain, late)
+                if new_late is not None:
+                    return candidate, new_late
+        return None
+
+    def _or_opt(self, route, late, deadline):
+        d = self.d
+        last = self._last_movable(route)
+        for length in (1, 2, 3):
+            for i in range(1, last - length + 1):
+                if time.perf_counter() > deadline:
+                    return None
+                segment = route[i:i + length]
+                prev = route[i - 1]
+                nxt = route[i + length] if i + length < len(route) else None
+                removed = d[prev][segment[0]]
+                if nxt is not None:
+                    removed += d[segment[-1]][nxt] - d[prev][nxt]
+                rest = route[:i] + route[i + length:]
+                rest_last = self._last_movable(rest)
+
+                for j in range(1, rest_last + 1):
+                    if j == i:
+                        continue
+                    a = rest[j - 1]
+                    added = d[a][segment[0]]
+                    if j < len(rest):
+                        b = rest[j]
+                        added += d[segment[-1]][b] - d[a][b]
+                    gain = removed - added
+                    if gain <= 1e-9 and late == 0:
+                        continue
+                    candidate = rest[:j] + segment + rest[j:]
+                    new_late = self._accept(candidate, gain, late)
+                    if new_late is not None:
+                        return candidate, new_late
+        return None
+
+    def solve(self, time_budget=0.5):
+        started = time.perf_counter()
+        deadline = started + time_budget
+
+        route = self.initial_route()
+        initial_cost = self.cost(route)
+        late = self.lateness(route)
+        moves = 0
+
+        while time.perf_counter() < deadline:
+            improved = self._or_opt(route, late, deadline) or self._two_opt(route, late, deadline)
+            if not improved:
+                break
+            route, late = improved
+            moves += 1
+
+        return {
+            'route': route,
+            'order': [node for node in route if node != 0],
+            'arrivals': self.schedule(route),
+            'duration': self.cost(route),
+            'initial_duration': initial_cost,
+            'lateness': late,
+            'feasible': late == 0 and not math.isinf(self.cost(route)),
+            'moves': moves,
+            'solver_ms': (time.perf_counter() - started) * 1000,
+        }
@@ -0,0 +1,82 @@
+import datetime
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.mediatypes import _MediaType
+
+
+# DRF's encoder knows how to handle Decimal, lazy strings, querysets etc.
+_drf_default = JSONEncoder().default
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        renderer_context = renderer_context or {}
+        indent = renderer_context.get('indent')
+        if indent is None and accepted_media_type:
+            indent = _MediaType(accepted_media_type).params.get('indent')
+        if indent:
+            options |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=_drf_default, option=options)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    return _drf_default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Binary MessagePack encoding, requested with `Accept: application/msgpack`.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+
+def _requested_option(request, name):
+    # Query parameter first, then a parameter on the accepted media type
+    value = request.query_params.get(name)
+    if not value and getattr(request, 'accepted_media_type', None):
+        value = _MediaType(request.accepted_media_type).params.get(name)
+    return value
+
+
+def requested_geometry_format(request):
+    """
+    Geometry encoding asked for by the client, either as a media type
+    parameter (`Accept: application/json; geometry=polyline`) or as a
+    `?geometry=polyline` query parameter. Defaults to 'geojson'.
+    """
+    return _requested_option(request, 'geometry') or 'geojson'
+
+
+def wants_map_html(request):
+    """
+    Whether to include the rendered folium map in route payloads. It embeds
+    the whole route again, so it is left out for compact (polyline) clients
+    unless they ask for it with `map=true`; `map=false` drops it for anyone.
+    """
+    value = _requested_option(request, 'map')
+    if value:
+        return value.lower() not in ('0', 'false', 'no')
+    return requested_geometry_format(request) != 'polyline'
@@ -0,0 +1,478 @@
+from datetime import datetime, timedelta
+import itertools
+import math
+import os
+from django.conf import settings
+from django.core.cache import caches
+import openrouteservice as ors
+from openrouteservice.directions import directions
+from openrouteservice.distance_matrix import distance_matrix
+import folium
+import geopy.distance
+import numpy as np
+from .matrix_store import get_matrix_store
+from .models import Location
+from .serializers import TripSerializer
+
+
+OPENROUTESERVICE_API_KEY = os.getenv('OPENROUTESERVICE_API_KEY')
+# Point at a self-hosted or stub ORS instead of the public API
+OPENROUTESERVICE_BASE_URL = os.getenv('OPENROUTESERVICE_BASE_URL', 'https://api.openrouteservice.org')
+
+
+def _ors_client():
+    return ors.Client(key=OPENROUTESERVICE_API_KEY, base_url=OPENROUTESERVICE_BASE_URL)
+
+
+# Marker colour and icon per waypoint kind
+WAYPOINT_ICONS = {
+    'start': ('red', 'truck'),
+    'pickup': ('green', 'industry'),
+    'dropoff': ('blue', 'flag'),
+    'stop': ('purple', 'map-marker'),
+}
+
+
+def plan_route(current_location, pickup_location, dropoff_location):
+    """
+    Route current -> pickup -> dropoff, compute rest stops, render the map
+    and save the Trip. Returns the calculate_route response payload.
+    """
+    return plan_waypoint_route([
+        {'location': current_location, 'name': 'Current Location', 'kind': 'start'},
+        {'location': pickup_location, 'name': 'Pickup', 'kind': 'pickup'},
+        {'location': dropoff_location, 'name': 'Dropoff', 'kind': 'dropoff'},
+    ])
+
+
+def _merge_routes(routes):
+    """Join consecutive geojson route legs into a single feature collection"""
+    merged = routes[0]
+    feature = merged['features'][0]
+    for leg in routes[1:]:
+        leg_feature = leg['features'][0]
+        offset = len(feature['geometry']['coordinates']) - 1
+        feature['geometry']['coordinates'].extend(leg_feature['geometry']['coordinates'][1:])
+        properties = feature['properties']
+        leg_properties = leg_feature['properties']
+        for key in ('distance', 'duration'):
+            properties['summary'][key] = (
+                properties['summary'].get(key, 0) + leg_properties['summary'].get(key, 0)
+            )
+        for segment in leg_properties.get('segments', []):
+            for step in segment.get('steps', []):
+                step['way_points'] = [w + offset for w in step['way_points']]
+            properties.setdefault('segments', []).append(segment)
+        properties['way_points'] = properties.get('way_points', [])[:-1] + [
+            w + offset for w in leg_properties.get('way_points', [])
+        ]
+        if merged.get('bbox') and leg.get('bbox'):
+            half = len(merged['bbox']) // 2
+            merged['bbox'] = (
+                [min(a, b) for a, b in zip(merged['bbox'][:half], leg['bbox'][:half])]
+                + [max(a, b) for a, b in zip(merged['bbox'][half:], leg['bbox'][half:])]
+            )
+    return merged
+
+
+def _directions(ors_client, coordinates):
+    """
+    ORS directions as geojson. Requests with more waypoints than the API
+    allows are split into legs sharing their end points and merged back.
+    """
+    limit = settings.ORS_MAX_WAYPOINTS
+    legs = []
+    start = 0
+    while True:
+        chunk = coordinates[start:start + limit]
+        legs.append(directions(
+            client=ors_client,
+            coordinates=chunk,
+            profile='driving-car',
+            format='geojson',
+            instructions=True,
+        ))
+        start += limit - 1
+        if start >= len(coordinates) - 1:
+            break
+    return _merge_routes(legs) if len(legs) > 1 else legs[0]
+
+
+def plan_waypoint_route(waypoints):
+    """
+    Route through the waypoints in the given order, compute rest stops,
+    render the map and save the Trip. Each waypoint is a dict with
+    'location' ([lon, lat]), 'name' and 'kind' (see WAYPOINT_ICONS).
+    """
+    ors_client = _ors_client()
+
+    # Define waypoints in the ORS format (lon, lat)
+    coordinates = [waypoint['location'] for waypoint in waypoints]
+    current_location = coordinates[0]
+    dropoff_location = coordinates[-1]
+
+    route = _directions(ors_client, coordinates)
+
+    total_distance = route['features'][0]['properties']['summary']['distance'] / 1000  # km
+    total_duration = route['features'][0]['properties']['summary']['duration'] / 3600  # hours
+
+    m = folium.Map(
+        location=[current_location[1], current_location[0]],
+        zoom_start=12,
+        tiles='cartodbpositron'
+    )
+
+    # Add route to map
+    folium.GeoJson(
+        route,
+        name='Route',
+        style_function=lambda x: {
+            'color': '#4285F4',
+            'weight': 5,
+            'opacity': 0.8
+        }
+    ).add_to(m)
+
+    for waypoint in waypoints:
+        coord = waypoint['location']
+        color, icon = WAYPOINT_ICONS.get(waypoint.get('kind'), WAYPOINT_ICONS['stop'])
+        folium.Marker(
+            location=[coord[1], coord[0]],
+            popup=f"<b>{waypoint['name']}</b>",
+            icon=folium.Icon(color=color, icon=icon)
+        ).add_to(m)
+
+    rest_stops = []
+    if total_duration > 4:  # Only calculate rest stops for trips that is over 4 hours
+        route_coordinates = route['features'][0]['geometry']['coordinates']
+
+        # Get distance along route for each coordinate
+        distances = []
+        running_dist = 0
+        prev_coord = None
+
+        for coord in route_coordinates:
+            if prev_coord:
+                # This will calculate distance between consecutive points
+                point1 = (prev_coord[1], prev_coord[0])  # lat, lon
+                point2 = (coord[1], coord[0])  # lat, lon
+                segment_dist = geopy.distance.geodesic(point1, point2).kilometers
+                running_dist += segment_dist
+                distances.append(running_dist)
+            else:
+                distances.append(0)
+            prev_coord = coord
+
+        # Calculate rest stop positions (every 4 hours of driving)
+        avg_speed = total_distance / total_duration  # km/h
+        distance_per_rest = 4 * avg_speed  # The distance covered in 4 hours
+
+        # Find coordinates for rest stops
+        next_rest_distance = distance_per_rest
+        for i, distance in enumerate(distances):
+            if distance >= next_rest_distance:
+                rest_stops.append({
+                    'location': route_coordinates[i],  # [lon, lat]
+                    'distance_km': distance
+                })
+                next_rest_distance += distance_per_rest
+
+        # Add rest stops to map
+        for i, stop in enumerate(rest_stops):
+            folium.Marker(
+                location=[stop['location'][1], stop['location'][0]],  # [lat, lon]
+                popup=f"<b>Rest Stop {i+1}</b><br>Distance: {stop['distance_km']:.1f} km",
+                icon=folium.Icon(color='orange', icon='bed')
+            ).add_to(m)
+    map_html = m._repr_html_()
+
+    trip_data = {
+        "start_latitude": current_location[1],
+        "start_longitude": current_location[0],
+        "destination_latitude": dropoff_location[1],
+        "destination_longitude": dropoff_location[0],
+        "start_time": datetime.now(),
+        "end_time": datetime.now() + timedelta(seconds=total_duration*3600),
+        "total_distance_km": total_distance,
+        "total_duration_hours": total_duration,
+    }
+    serializer = TripSerializer(data=trip_data)
+    serializer.is_valid(raise_exception=True)
+    trip = serializer.save()
+
+    return {
+        'route_geojson': route,
+        'total_distance_km': total_distance,
+        'total_duration_hours': total_duration,
+        'waypoints': coordinates,
+        'rest_stops': rest_stops,
+        'map_html': map_html,
+        'trip_id': trip.id
+    }
+
+
+def _pair_key(origin, destination):
+    return 'route-pair:%.5f,%.5f:%.5f,%.5f' % (
+        origin[0], origin[1], destination[0], destination[1]
+    )
+
+
+def stop_matrix(locations):
+    """
+    Driving duration (seconds) and distance (meters) between every pair of
+    locations, as two n x n lists. Pairs are cached individually so repeated
+    stops only cost an ORS matrix call the first time they are seen.
+    Unroutable pairs come back as math.inf.
+    """
+    n = len(locations)
+    keys = [[_pair_key(a, b) for b in locations] for a in locations]
+    cache = caches['route_matrix']
+    cached = cache.get_many([key for row in keys for key in row])
+
+    # Pairs between registered locations come from the persistent store
+    ids = registered_location_ids(locations)
+    known = [i for i, location_id in enumerate(ids) if location_id is not None]
+    if len(known) > 1:
+        store_durations, store_distances = get_matrix_store().submatrix([ids[i] for i in known])
+        for a, i in enumerate(known):
+            for b, j in enumerate(known):
+                if i != j and not np.isnan(store_durations[a, b]):
+                    cached[keys[i][j]] = (
+                        float(store_durations[a, b]),
+                        float(store_distances[a, b]),
+                    )
+
+    missing = {
+        (i, j) for i in range(n) for j in range(n)
+        if i != j and keys[i][j] not in cached
+    }
+
+    # Pick the few locations that account for the missing pairs (usually the
+    # new ones) and fetch only their rows and columns.
+    if len(missing) == n * (n - 1):
+        fresh = list(range(n))
+    else:
+        fresh = []
+        while missing:
+            counts = {}
+            for i, j in missing:
+                counts[i] = counts.get(i, 0) + 1
+                counts[j] = counts.get(j, 0) + 1
+            node = max(counts, key=counts.get)
+            fresh.append(node)
+            missing = {pair for pair in missing if node not in pair}
+
+    if fresh:
+        ors_client = _ors_client()
+        others = [i for i in range(n) if i not in fresh]
+        fetched = {}
+
+        def fetch(sources, destinations):
+            rows_per_call = max(1, settings.ORS_MATRIX_MAX_ELEMENTS // len(destinations))
+            for start in range(0, len(sources), rows_per_call):
+                chunk = sources[start:start + rows_per_call]
+                result = distance_matrix(
+                    client=ors_client,
+                    locations=locations,
+                    profile='driving-car',
+                    sources=chunk,
+                    destinations=destinations,
+                    metrics=['duration', 'distance'],
+                )
+                for row, i in enumerate(chunk):
+                    for col, j in enumerate(destinations):
+                        fetched[keys[i][j]] = (
+                            result['durations'][row][col],
+                            result['distances'][row][col],
+                        )
+
+        fetch(fresh, list(range(n)))
+        if others:
+            fetch(others, fresh)
+        cache.set_many(fetched, timeout=settings.ROUTE_MATRIX_CACHE_TIMEOUT)
+        cached.update(fetched)
+
+    durations = [[0.0] * n for _ in range(n)]
+    distances = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            if i == j:
+                continue
+            duration, distance = cached[keys[i][j]]
+            durations[i][j] = math.inf if duration is None else duration
+            distances[i][j] = math.inf if distance is None else distance
+    return durations, distances
+
+
+def registered_location_ids(locations):
+    """Location id for each [lon, lat] that is in the registry, else None"""
+    coord_keys = [Location.key_for(lon, lat) for lon, lat in locations]
+    found = dict(Location.objects.filter(
+        coord_key__in=set(coord_keys)
+    ).values_list('coord_key', 'id'))
+    return [found.get(key) for key in coord_keys]
+
+
+def estimate_route(coordinates):
+    """
+    Quick duration/distance estimate for driving through the coordinates in
+    order, using only the persistent matrix (no routing call). Legs between
+    unregistered or not yet fetched locations are None.
+    """
+    store = get_matrix_store()
+    ids = registered_location_ids(coordinates)
+    legs = []
+    for origin, destination in zip(ids, ids[1:]):
+        pair = store.get(origin, destination) if origin and destination else None
+        if pair is None:
+            legs.append(None)
+            continue
+        duration, distance = pair
+        legs.append({
+            'duration_hours': duration / 3600,
+            'distance_km': distance / 1000,
+            'routable': not math.isinf(duration),
+        })
+
+    complete = all(leg is not None for leg in legs)
+    routable = all(leg['routable'] for leg in legs if leg is not None)
+    return {
+        'legs': legs,
+        'complete': complete,
+        'routable': routable,
+        'total_duration_hours': (
+            sum(leg['duration_hours'] for leg in legs) if complete and routable else None
+        ),
+        'total_distance_km': (
+            sum(leg['distance_km'] for leg in legs) if complete and routable else None
+        ),
+    }
+
+
+def fill_location_matrix(max_requests=None):
+    """
+    Fetch missing pairs between registered locations into the persistent
+    matrix, in ORS-sized batches. New locations get their row and column
+    fetched; any other gaps are filled row by row. Returns the number of
+    matrix requests made.
+    """
+    locations = list(Location.objects.order_by('id').values_list('id', 'longitude', 'latitude'))
+    if len(locations) < 2:
+        return 0
+
+    ids = [location_id for location_id, _, _ in locations]
+    coordinates = [[lon, lat] for _, lon, lat in locations]
+    store = get_matrix_store()
+    store.ensure_capacity(max(ids) + 1)
+
+    durations, _ = store.submatrix(ids)
+    missing = np.isnan(durations)
+    np.fill_diagonal(missing, False)
+    n = len(ids)
+
+    # Locations never fetched before: their whole row is unknown
+    fresh = [i for i in range(n) if missing[i].sum() >= n - 1]
+    others = [i for i in range(n) if i not in fresh]
+
+    batches = []
+    if fresh:
+        batches.append((fresh, list(range(n))))
+        if others:
+            batches.append((others, fresh))
+    fresh_set = set(fresh)
+    gap_rows = [
+        i for i in others
+        if any(j not in fresh_set for j in np.flatnonzero(missing[i]))
+    ]
+    if gap_rows:
+        batches.append((gap_rows, list(range(n))))
+
+    ors_client = _ors_client()
+    requests_made = 0
+    for sources, destinations in batches:
+        rows_per_call = max(1, settings.ORS_MATRIX_MAX_ELEMENTS // len(destinations))
+        for start in range(0, len(sources), rows_per_call):
+            if max_requests is not None and requests_made >= max_requests:
+                return requests_made
+            chunk = sources[start:start + rows_per_call]
+            result = distance_matrix(
+                client=ors_client,
+                locations=coordinates,
+                profile='driving-car',
+                sources=chunk,
+                destinations=destinations,
+                metrics=['duration', 'distance'],
+            )
+            requests_made += 1
+            store.set_block(
+                [ids[i] for i in chunk],
+                [ids[j] for j in destinations],
+                result['durations'],
+                result['distances'],
+            )
+    return requests_made
+
+
+def encode_polyline(coordinates, precision=5):
+    """
+    Encode [lon, lat] pairs with Google's encoded polyline algorithm
+    (lat/lon order on the wire, as decoded by most map libraries).
+    Vectorised with numpy, since routes can have tens of thousands of points.
+    """
+    if not len(coordinates):
+        return ''
+    if len(coordinates[0]) == 2:
+        # Much faster than np.asarray for long lists of [lon, lat] lists
+        points = np.fromiter(
+            itertools.chain.from_iterable(coordinates),
+            dtype=np.float64, count=2 * len(coordinates)
+        ).reshape(-1, 2)
+    else:
+        points = np.asarray(coordinates, dtype=np.float64)[:, :2]
+
+    scaled = np.round(points[:, ::-1] * 10 ** precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=0).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1).astype(np.uint64)
+
+    # Split each value into 5-bit chunks, low bits first; every chunk but
+    # the last of a value carries the 0x20 continuation bit.
+    lengths = np.ones(len(values), dtype=np.int64)
+    shift = 5
+    while True:
+        more = (values >> np.uint64(shift)) > 0
+        if not more.any():
+            break
+        lengths += more
+        shift += 5
+    shifts = np.arange(lengths.max(), dtype=np.uint64) * np.uint64(5)
+    chunks = ((values[:, None] >> shifts) & np.uint64(0x1f)).astype(np.uint8)
+    position = np.arange(len(shifts))
+    chunks[position < lengths[:, None] - 1] |= 0x20
+    return (chunks[position < lengths[:, None]] + 63).tobytes().decode('ascii')
+
+
+def with_polyline_geometry(payload, precision=5):
+    """
+    Return a copy of a calculate_route payload whose route geometries are
+    encoded polylines instead of coordinate arrays.
+    """
+    route = payload.get('route_geojson')
+    if not route:
+        return payload
+
+    features = []
+    for feature in route.get('features', []):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') == 'LineString':
+            feature = {
+                **feature,
+                'geometry': {
+                    'type': 'LineString',
+                    'encoding': 'polyline',
+                    'precision': precision,
+                    'coordinates': encode_polyline(geometry['coordinates'], precision),
+                }
+            }
+        features.append(feature)
+
+    return {**payload, 'route_geojson': {**route, 'features': features}}
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Trip, DailyLog, StatusLog
+from .models import Trip, DailyLog, StatusLog, RouteJob, Location
 
 
 class StatusLogSerializer(serializers.ModelSerializer):
@@ -28,3 +28,47 @@ class DailyLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = DailyLog
         fields = '__all__'
+
+class RouteJobSerializer(serializers.ModelSerializer):
+    duration_seconds = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = RouteJob
+        fields = [
+            'id', 'status', 'payload', 'result', 'error',
+            'created_at', 'started_at', 'finished_at', 'duration_seconds'
+        ]
+        read_only_fields = fields
+
+class RouteJobSummarySerializer(RouteJobSerializer):
+    """Job listing without the route result, which can run to megabytes"""
+    class Meta(RouteJobSerializer.Meta):
+        fields = [
+            'id', 'status', 'payload', 'error',
+            'created_at', 'started_at', 'finished_at', 'duration_seconds'
+        ]
+        read_only_fields = fields
+
+class DuplicateLocation(Exception):
+    """Raised when a location would share its coordinates with another one."""
+
+    def __init__(self, location_id):
+        super().__init__(f"Location {location_id} is already registered at these coordinates")
+        self.location_id = location_id
+
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Location
+        fields = '__all__'
+
+    def validate(self, attrs):
+        # coord_key is derived in Location.save, so DRF does not check that it is unique
+        longitude = attrs.get('longitude', getattr(self.instance, 'longitude', None))
+        latitude = attrs.get('latitude', getattr(self.instance, 'latitude', None))
+        existing = Location.objects.filter(coord_key=Location.key_for(longitude, latitude))
+        if self.instance is not None:
+            existing = existing.exclude(pk=self.instance.pk)
+        existing_id = existing.values_list('id', flat=True).first()
+        if existing_id is not None:
+            raise DuplicateLocation(existing_id)
+        return attrs
@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'trucking_app.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -100,6 +101,11 @@ DATABASES = {
     }
 }
 
+# Set only by the load-testing harness (loadtest/run.py) to point the app at a
+# throwaway database; it does not change which database deployments use
+if os.getenv('LOADTEST_DATABASE_URL'):
+    DATABASES['default'] = dj_database_url.parse(os.getenv('LOADTEST_DATABASE_URL'))
+
 # ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
 # POSTGRES_LOCALLY = True
 # if ENVIRONMENT == 'production' or POSTGRES_LOCALLY == True:
@@ -117,6 +123,82 @@ DATABASES = {
 #     }
 # }
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'trucking_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'trucking_app.renderers.MessagePackRenderer',
+    ],
+}
+
+# Response compression
+# Bodies smaller than this many bytes are sent uncompressed
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', 1024))
+RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', 5))
+RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', 6))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Per stop-pair driving durations/distances used by multi-stop planning
+    'route_matrix': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'route-matrix',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('ROUTE_MATRIX_CACHE_MAX_ENTRIES', 200000)),
+        },
+    },
+}
+
+# OpenRouteService limits
+ORS_MAX_WAYPOINTS = int(os.getenv('ORS_MAX_WAYPOINTS', 50))
+ORS_MATRIX_MAX_ELEMENTS = int(os.getenv('ORS_MATRIX_MAX_ELEMENTS', 3500))
+
+# Longest date range served by the status timeline endpoint, in days
+STATUS_TIMELINE_MAX_DAYS = int(os.getenv('STATUS_TIMELINE_MAX_DAYS', 31))
+# Longest date range served by the status log CSV export, in days
+STATUS_EXPORT_MAX_DAYS = int(os.getenv('STATUS_EXPORT_MAX_DAYS', 366))
+
+# Persistent distance/duration matrix between registered locations
+ROUTE_MATRIX_DIR = Path(os.getenv('ROUTE_MATRIX_DIR', BASE_DIR / 'matrix_store'))
+
+# Multi-stop planning
+MULTI_STOP_MAX_STOPS = int(os.getenv('MULTI_STOP_MAX_STOPS', 150))
+# Default solver time budget per plan, in milliseconds
+MULTI_STOP_TIME_BUDGET_MS = int(os.getenv('MULTI_STOP_TIME_BUDGET_MS', 500))
+# Stop-pair durations/distances are cached this many seconds
+ROUTE_MATRIX_CACHE_TIMEOUT = int(os.getenv('ROUTE_MATRIX_CACHE_TIMEOUT', 7 * 24 * 3600))
+
+# Live updates (server-sent events at /api/events/)
+EVENT_BROKER = os.getenv('EVENT_BROKER', 'trucking_app.events.InProcessBroker')
+# Events buffered per subscriber before the oldest are dropped
+EVENT_QUEUE_SIZE = int(os.getenv('EVENT_QUEUE_SIZE', 100))
+EVENT_HEARTBEAT_SECONDS = int(os.getenv('EVENT_HEARTBEAT_SECONDS', 20))
+EVENT_RETRY_MS = int(os.getenv('EVENT_RETRY_MS', 3000))
+
+# Background route jobs
+# Route calculations can be queued instead of run inside the request. Jobs are
+# stored in the database and executed by an in-process thread pool, or by
+# `python manage.py run_route_jobs` when ROUTE_JOBS_IN_PROCESS is off.
+ROUTE_JOBS_IN_PROCESS = os.getenv('ROUTE_JOBS_IN_PROCESS', 'true').lower() == 'true'
+# Threads per process: with N gunicorn workers up to N * ROUTE_JOB_WORKERS jobs run at once
+ROUTE_JOB_WORKERS = int(os.getenv('ROUTE_JOB_WORKERS', 2))
+ROUTE_JOB_MAX_PENDING = int(os.getenv('ROUTE_JOB_MAX_PENDING', 100))
+# Jobs older than this are no longer reused for deduplication, and pending or
+# running jobs older than this are treated as lost and failed
+ROUTE_JOB_TIMEOUT = int(os.getenv('ROUTE_JOB_TIMEOUT', 300))
+# Finished jobs and their results are deleted after this many days
+ROUTE_JOB_RETENTION_DAYS = int(os.getenv('ROUTE_JOB_RETENTION_DAYS', 7))
+
+# Log archive
+# `python manage.py archive_logs` moves status logs and daily logs older than
+# ARCHIVE_HORIZON_DAYS into compressed monthly files under ARCHIVE_DIR.
+ARCHIVE_DIR = Path(os.getenv('ARCHIVE_DIR', BASE_DIR / 'archive'))
+ARCHIVE_HORIZON_DAYS = int(os.getenv('ARCHIVE_HORIZON_DAYS', 30))
+# The 70-hour/8-day rule needs at least this much history in the hot tables
+ARCHIVE_MIN_HORIZON_DAYS = 8
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,96 @@
+from datetime import datetime, time, timedelta
+from .models import StatusLog
+from .archive import archived_status_logs
+
+
+# Closed logs longer than this are found through the duration index
+LONG_STATUS = timedelta(hours=48)
+
+
+def overlapping_status_logs(start, end):
+    """
+    Status logs that overlap [start, end): `time < end AND (end_time > start
+    OR end_time IS NULL)`, run as a UNION ALL of three range scans so the
+    rows read depend on the range and not on how long the history is:
+
+    - closed logs that started at most LONG_STATUS before the range (time index)
+    - closed logs that started earlier, which must be longer than LONG_STATUS
+      (duration index; such logs are rare)
+    - the open log (end_time index)
+
+    Rows are sorted in Python: an ORDER BY on the union leads SQLite to
+    read every part through the time index instead.
+    """
+    fields = ('id', 'status', 'time', 'end_time')
+    recent = StatusLog.objects.filter(
+        time__gte=start - LONG_STATUS, time__lt=end, end_time__gt=start
+    ).order_by().values(*fields)
+    long_running = StatusLog.objects.filter(
+        duration__gt=LONG_STATUS, time__lt=start - LONG_STATUS, end_time__gt=start
+    ).order_by().values(*fields)
+    still_open = StatusLog.objects.filter(end_time__isnull=True, time__lt=end).order_by().values(*fields)
+    rows = recent.union(long_running, still_open, all=True)
+    return sorted(rows, key=lambda log: log['time'])
+
+
+def status_logs_between(start, end):
+    """
+    Status logs overlapping [start, end) from both the hot table and the
+    archive. Archive files are only opened when the range reaches back far
+    enough to overlap an archived month.
+
+    A log can be in both if archiving wrote its segment but failed to delete
+    the hot rows, so archived copies of hot logs are dropped.
+    """
+    archived = archived_status_logs(start, end)
+    hot = overlapping_status_logs(start, end)
+    if not archived:
+        return hot
+    hot_ids = {log['id'] for log in hot}
+    archived = [log for log in archived if log['id'] not in hot_ids]
+    return sorted(archived + hot, key=lambda log: log['time'])
+
+
+def build_timeline(logs, start_date, end_date, now=None):
+    """
+    Split status logs into per-day segments between start_date and
+    end_date (inclusive). Segments are clipped at midnight, and a status
+    that is still open runs until `now`.
+    """
+    now = now or datetime.now()
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    days = {}
+    day = start_date
+    while day <= end_date:
+        days[day] = {
+            'date': day,
+            'segments': [],
+            'totals': {status: 0 for status, _ in StatusLog.STATUS_CHOICES},
+        }
+        day += timedelta(days=1)
+
+    for log in logs:
+        is_open = log['end_time'] is None
+        segment_start = max(log['time'], range_start)
+        segment_end = min(now if is_open else log['end_time'], range_end)
+
+        cursor = segment_start
+        while cursor < segment_end:
+            midnight = datetime.combine(cursor.date() + timedelta(days=1), time.min)
+            piece_end = min(midnight, segment_end)
+            hours = (piece_end - cursor).total_seconds() / 3600
+            bucket = days[cursor.date()]
+            bucket['segments'].append({
+                'log_id': log['id'],
+                'status': log['status'],
+                'start': cursor,
+                'end': piece_end,
+                'duration_hours': hours,
+                'open': is_open,
+            })
+            bucket['totals'][log['status']] += hours
+            cursor = piece_end
+
+    return list(days.values())
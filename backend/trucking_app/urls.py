@@ -17,15 +17,18 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TripViewSet, StatusLogViewSet, DailyLogViewSet
+from .views import TripViewSet, StatusLogViewSet, DailyLogViewSet, RouteJobViewSet, LocationViewSet, event_stream
 
 
 router = DefaultRouter()
 router.register(r'trips', TripViewSet)
 router.register(r'status-logs', StatusLogViewSet)
 router.register(r'daily-logs', DailyLogViewSet)
+router.register(r'route-jobs', RouteJobViewSet)
+router.register(r'locations', LocationViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/events/', event_stream, name='event-stream'),
     path('api/', include(router.urls)),
 ]
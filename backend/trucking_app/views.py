@@ -1,23 +1,48 @@
+import csv
+import math
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.db import transaction
 from django.db.models import Sum
 from datetime import datetime, timedelta
-import os
-from .models import Trip, DailyLog, StatusLog
+from .models import Trip, DailyLog, StatusLog, RouteJob, Location
 from .serializers import (
     TripSerializer, 
     DailyLogSerializer, 
-    StatusLogSerializer
+    StatusLogSerializer,
+    RouteJobSerializer,
+    RouteJobSummarySerializer,
+    LocationSerializer,
+    DuplicateLocation
 )
-import openrouteservice as ors
-from openrouteservice.directions import directions
-import folium
-import geopy.distance
+from .routing import (
+    estimate_route,
+    plan_route,
+    plan_waypoint_route,
+    stop_matrix,
+    with_polyline_geometry
+)
+from .optimizer import StopOrderSolver
+from .matrix_store import get_matrix_store
+from .timeline import status_logs_between, build_timeline
+from .archive import archived_daily_logs, latest_archived_daily_log
+from .events import publish_on_commit
+from .renderers import requested_geometry_format, wants_map_html
+from .jobs import enqueue_route_job, job_metrics, RouteQueueFull
+
 
+def route_payload_for(request, payload):
+    """Apply the client's geometry encoding and map_html preferences to a route payload"""
+    if requested_geometry_format(request) == 'polyline':
+        payload = with_polyline_geometry(payload)
+    if 'map_html' in payload and not wants_map_html(request):
+        payload = {key: value for key, value in payload.items() if key != 'map_html'}
+    return payload
 
-OPENROUTESERVICE_API_KEY = os.getenv('OPENROUTESERVICE_API_KEY')
 
 class TripViewSet(viewsets.ModelViewSet):
     queryset = Trip.objects.all()
@@ -37,125 +62,211 @@ class TripViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            ors_client = ors.Client(key=OPENROUTESERVICE_API_KEY)
-            
-            # Define waypoints in the ORS format (lon, lat)
-            coordinates = [
-                current_location,
-                pickup_location,
-                dropoff_location
-            ]
+            # Cheap checks against the persistent matrix before calling ORS
+            estimate = estimate_route([current_location, pickup_location, dropoff_location])
+            if not estimate['routable']:
+                return Response(
+                    {"error": "No drivable route between the given locations", "estimate": estimate},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if str(request.data.get('estimate_only', '')).lower() in ('1', 'true'):
+                return Response({'estimate': estimate})
 
-            route = directions(
-                client=ors_client,
-                coordinates=coordinates,
-                profile='driving-car',
-                format='geojson',
-                instructions=True,
+            if str(request.data.get('async', '')).lower() in ('1', 'true'):
+                payload = {
+                    'current_location': current_location,
+                    'pickup_location': pickup_location,
+                    'dropoff_location': dropoff_location,
+                }
+                try:
+                    job, created = enqueue_route_job(payload)
+                except RouteQueueFull as e:
+                    return Response(
+                        {"error": str(e)},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE
+                    )
+                return Response(
+                    {
+                        'job_id': job.id,
+                        'status': job.status,
+                        'deduplicated': not created
+                    },
+                    status=status.HTTP_202_ACCEPTED
+                )
+
+            result = plan_route(current_location, pickup_location, dropoff_location)
+            result = route_payload_for(request, result)
+            return Response(result)
+    
+        except Exception as e:
+            return Response(
+                {"error": str(e)}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-            total_distance = route['features'][0]['properties']['summary']['distance'] / 1000  # km
-            total_duration = route['features'][0]['properties']['summary']['duration'] / 3600  # hours
+    def _parse_location(self, value, label):
+        """A numeric [lon, lat] pair, or ValueError naming the bad input"""
+        try:
+            if isinstance(value, str) or len(value) != 2:
+                raise ValueError
+            lon, lat = float(value[0]), float(value[1])
+        except (TypeError, ValueError):
+            raise ValueError(f"{label} must be a [lon, lat] pair of numbers")
+        if not (math.isfinite(lon) and math.isfinite(lat)):
+            raise ValueError(f"{label} must be a [lon, lat] pair of numbers")
+        return [lon, lat]
+
+    def _parse_stops(self, stops, start_time):
+        """Validate multi-stop input and convert time windows to seconds"""
+        if not isinstance(stops, list) or not stops:
+            raise ValueError("At least one stop is required")
+        if len(stops) > settings.MULTI_STOP_MAX_STOPS:
+            raise ValueError(f"At most {settings.MULTI_STOP_MAX_STOPS} stops are supported")
+
+        def offset(value):
+            if value is None:
+                return None
+            moment = datetime.fromisoformat(str(value).replace('Z', ''))
+            return (moment - start_time).total_seconds()
+
+        parsed = []
+        for index, stop in enumerate(stops):
+            if not isinstance(stop, dict):
+                raise ValueError(f"Stop {index} must be an object")
+            location = self._parse_location(stop.get('location'), f"Stop {index} location")
+            kind = stop.get('type', 'stop')
+            if kind not in ('pickup', 'dropoff', 'stop'):
+                raise ValueError(f"Stop {index} has an unknown type '{kind}'")
+            window = stop.get('time_window')
+            if window is not None and (not isinstance(window, (list, tuple)) or len(window) != 2):
+                raise ValueError(f"Stop {index} time_window must be a [start, end] pair")
+            parsed.append({
+                'id': str(stop.get('id', index)),
+                'location': location,
+                'type': kind,
+                'pickup_id': stop.get('pickup_id'),
+                'time_window': (offset(window[0]), offset(window[1])) if window else None,
+                'service_seconds': float(stop.get('service_minutes', 0)) * 60,
+            })
+
+        ids = [stop['id'] for stop in parsed]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Stop ids must be unique")
+        # Only dropoffs and plain stops may depend on a pickup, and pickups
+        # cannot depend on anything, so precedence chains cannot form cycles
+        pickups = {stop['id'] for stop in parsed if stop['type'] == 'pickup'}
+        for stop in parsed:
+            if stop['pickup_id'] is None:
+                continue
+            if stop['type'] == 'pickup':
+                raise ValueError(f"Pickup {stop['id']} cannot have a pickup_id")
+            if str(stop['pickup_id']) == stop['id']:
+                raise ValueError(f"Stop {stop['id']} cannot refer to itself as its pickup")
+            if str(stop['pickup_id']) not in pickups:
+                raise ValueError(f"Stop {stop['id']} refers to unknown pickup '{stop['pickup_id']}'")
+        return parsed
+
+    @action(detail=False, methods=['POST'])
+    def plan_multi_stop(self, request):
+        """Find a good stop order for many pickups and drops, then route it"""
+        try:
+            current_location = request.data.get('current_location')  # [lon, lat]
+            if not current_location:
+                return Response(
+                    {"error": "Missing location coordinates"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-            m = folium.Map(
-                location=[current_location[1], current_location[0]],
-                zoom_start=12,
-                tiles='cartodbpositron'
+            try:
+                current_location = self._parse_location(current_location, "current_location")
+                start_time = request.data.get('start_time')
+                start_time = (
+                    datetime.fromisoformat(start_time.replace('Z', ''))
+                    if start_time else datetime.now()
+                )
+                stops = self._parse_stops(request.data.get('stops'), start_time)
+                time_budget_ms = min(
+                    float(request.data.get('time_budget_ms', settings.MULTI_STOP_TIME_BUDGET_MS)),
+                    5000
+                )
+            except (ValueError, TypeError, AttributeError) as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            return_to_start = bool(request.data.get('return_to_start', False))
+            locations = [current_location] + [stop['location'] for stop in stops]
+            durations, distances = stop_matrix(locations)
+
+            # The solver cannot schedule around legs with no drivable route
+            names = ['current_location'] + [f"stop {stop['id']}" for stop in stops]
+            unroutable = [
+                f"{names[i]} -> {names[j]}"
+                for i, row in enumerate(durations)
+                for j, duration in enumerate(row)
+                if math.isinf(duration)
+            ]
+            if unroutable:
+                return Response(
+                    {"error": f"No drivable route for: {', '.join(unroutable[:10])}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            node_of = {stop['id']: i + 1 for i, stop in enumerate(stops)}
+            solver = StopOrderSolver(
+                durations,
+                service_times=[0] + [stop['service_seconds'] for stop in stops],
+                time_windows=[None] + [stop['time_window'] for stop in stops],
+                pickup_of={
+                    node_of[stop['id']]: node_of[str(stop['pickup_id'])]
+                    for stop in stops if stop['pickup_id'] is not None
+                },
+                return_to_start=return_to_start,
             )
-            
-            # Add route to map
-            folium.GeoJson(
-                route,
-                name='Route',
-                style_function=lambda x: {
-                    'color': '#4285F4',
-                    'weight': 5,
-                    'opacity': 0.8
-                }
-            ).add_to(m)
-
-            waypoint_names = ['Current Location', 'Pickup', 'Dropoff']
-            for i, (coord, name) in enumerate(zip(coordinates, waypoint_names)):
-                folium.Marker(
-                    location=[coord[1], coord[0]],
-                    popup=f"<b>{name}</b>",
-                    icon=folium.Icon(
-                        color='red' if i == 0 else 'green' if i == 1 else 'blue',
-                        icon='truck' if i == 0 else 'industry' if i == 1 else 'flag'
-                    )
-                ).add_to(m)
+            solution = solver.solve(time_budget=time_budget_ms / 1000)
 
-            rest_stops = []
-            if total_duration > 4:  # Only calculate rest stops for trips that is over 4 hours
-                route_coordinates = route['features'][0]['geometry']['coordinates']
-                
-                # Get distance along route for each coordinate
-                distances = []
-                running_dist = 0
-                prev_coord = None
-                
-                for coord in route_coordinates:
-                    if prev_coord:
-                        # This will calculate distance between consecutive points
-                        point1 = (prev_coord[1], prev_coord[0])  # lat, lon
-                        point2 = (coord[1], coord[0])  # lat, lon
-                        segment_dist = geopy.distance.geodesic(point1, point2).kilometers
-                        running_dist += segment_dist
-                        distances.append(running_dist)
-                    else:
-                        distances.append(0)
-                    prev_coord = coord
-                
-                # Calculate rest stop positions (every 4 hours of driving)
-                avg_speed = total_distance / total_duration  # km/h
-                distance_per_rest = 4 * avg_speed  # The distance covered in 4 hours
-                
-                # Find coordinates for rest stops
-                next_rest_distance = distance_per_rest
-                for i, distance in enumerate(distances):
-                    if distance >= next_rest_distance:
-                        rest_stops.append({
-                            'location': route_coordinates[i],  # [lon, lat]
-                            'distance_km': distance
-                        })
-                        next_rest_distance += distance_per_rest
-
-                # Add rest stops to map
-                for i, stop in enumerate(rest_stops):
-                    folium.Marker(
-                        location=[stop['location'][1], stop['location'][0]],  # [lat, lon]
-                        popup=f"<b>Rest Stop {i+1}</b><br>Distance: {stop['distance_km']:.1f} km",
-                        icon=folium.Icon(color='orange', icon='bed')
-                    ).add_to(m)
-            map_html = m._repr_html_()
-
-            trip_data = {
-                "start_latitude": current_location[1],
-                "start_longitude": current_location[0],
-                "destination_latitude": dropoff_location[1],
-                "destination_longitude": dropoff_location[0],
-                "start_time": datetime.now(),
-                "end_time": datetime.now() + timedelta(seconds=total_duration*3600),
-                "total_distance_km": total_distance,
-                "total_duration_hours": total_duration,
-            }
-            serializer = self.get_serializer(data=trip_data)
-            serializer.is_valid(raise_exception=True)
-            trip = serializer.save()
-            
-            return Response({
-                'route_geojson': route,
-                'total_distance_km': total_distance,
-                'total_duration_hours': total_duration,
-                'waypoints': coordinates,
-                'rest_stops': rest_stops,
-                'map_html': map_html,
-                'trip_id': trip.id
+            waypoints = [{'location': current_location, 'name': 'Current Location', 'kind': 'start'}]
+            schedule = []
+            route = solution['route']
+            for position, node in enumerate(route[1:], start=1):
+                if node == 0:
+                    waypoints.append({'location': current_location, 'name': 'Return', 'kind': 'start'})
+                    continue
+                stop = stops[node - 1]
+                waypoints.append({
+                    'location': stop['location'],
+                    'name': f"{stop['type'].title()} {stop['id']}",
+                    'kind': stop['type'],
+                })
+                schedule.append({
+                    'id': stop['id'],
+                    'type': stop['type'],
+                    'location': stop['location'],
+                    'eta': start_time + timedelta(seconds=solution['arrivals'][position]),
+                    'leg_distance_km': distances[route[position - 1]][node] / 1000,
+                })
+
+            result = plan_waypoint_route(waypoints)
+            result = route_payload_for(request, result)
+
+            result.update({
+                'stop_order': [stop['id'] for stop in schedule],
+                'schedule': schedule,
+                'solver': {
+                    'solver_ms': solution['solver_ms'],
+                    'moves': solution['moves'],
+                    'initial_duration_hours': solution['initial_duration'] / 3600,
+                    'optimized_duration_hours': solution['duration'] / 3600,
+                    'time_windows_met': solution['feasible'],
+                    'lateness_minutes': solution['lateness'] / 60,
+                },
             })
-    
+            return Response(result)
+
         except Exception as e:
             return Response(
-                {"error": str(e)}, 
+                {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
@@ -209,6 +320,11 @@ class StatusLogViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
+
+        publish_on_commit('status', {
+            'log': serializer.data,
+            'closed_log': self.get_serializer(latest_status).data if latest_status else None,
+        })
         
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
@@ -221,6 +337,74 @@ class StatusLogViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    def _parse_date_range(self, request, max_days):
+        """Read start/end (YYYY-MM-DD, inclusive) from the query string"""
+        try:
+            end = request.query_params.get('end')
+            end = datetime.strptime(end, '%Y-%m-%d').date() if end else datetime.now().date()
+            start = request.query_params.get('start')
+            start = datetime.strptime(start, '%Y-%m-%d').date() if start else end
+        except ValueError:
+            raise ValueError("Invalid date format. Expected YYYY-MM-DD")
+
+        if start > end:
+            raise ValueError("start must not be after end")
+        if (end - start).days + 1 > max_days:
+            raise ValueError(f"Date range is limited to {max_days} days")
+        return start, end
+
+    @action(detail=False, methods=['GET'])
+    def timeline(self, request):
+        """Duty-status segments per day, clipped at midnight"""
+        try:
+            start, end = self._parse_date_range(request, settings.STATUS_TIMELINE_MAX_DAYS)
+        except ValueError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        range_start = datetime.combine(start, datetime.min.time())
+        range_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        logs = status_logs_between(range_start, range_end)
+
+        return Response({
+            'start': start,
+            'end': end,
+            'days': build_timeline(logs, start, end),
+        })
+
+    @action(detail=False, methods=['GET'])
+    def export(self, request):
+        """Status logs between start and end as CSV, including archived ones"""
+        try:
+            start, end = self._parse_date_range(request, settings.STATUS_EXPORT_MAX_DAYS)
+        except ValueError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        logs = status_logs_between(
+            datetime.combine(start, datetime.min.time()),
+            datetime.combine(end + timedelta(days=1), datetime.min.time())
+        )
+
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="status-logs-{start}-{end}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['id', 'status', 'start', 'end', 'duration_hours'])
+        for log in logs:
+            duration = (log['end_time'] - log['time']).total_seconds() / 3600 if log['end_time'] else ''
+            writer.writerow([
+                log['id'],
+                log['status'],
+                log['time'].isoformat(),
+                log['end_time'].isoformat() if log['end_time'] else '',
+                duration,
+            ])
+        return response
+
 
 class DailyLogViewSet(viewsets.ModelViewSet):
     queryset = DailyLog.objects.all().order_by('-date')
@@ -245,7 +429,12 @@ class DailyLogViewSet(viewsets.ModelViewSet):
         previous_log = DailyLog.objects.filter(
             date__lt=date
         ).order_by('-date').first()
-        previous_mileage = previous_log.cumulative_mileage if previous_log else 0
+        if previous_log:
+            previous_mileage = previous_log.cumulative_mileage
+        else:
+            # Older logs may have been moved to the archive
+            archived_log = latest_archived_daily_log(date)
+            previous_mileage = archived_log['cumulative_mileage'] if archived_log else 0
         
         return {
             'total_miles': total_miles,
@@ -280,11 +469,23 @@ class DailyLogViewSet(viewsets.ModelViewSet):
                 daily_log = queryset.filter(date=date).first()
                 
                 if daily_log:
-                    for key, value in daily_log_data.items():
-                        if key != 'trips':  # Handle trips separately
-                            setattr(daily_log, key, value)
-                    daily_log.trip.set(daily_log_data['trips'])
-                    daily_log.save()
+                    # Only write and notify subscribers when the recalculation
+                    # changed something, so plain reads do not become events
+                    changed = [
+                        key for key, value in daily_log_data.items()
+                        if key != 'trips' and getattr(daily_log, key) != value
+                    ]
+                    for key in changed:
+                        setattr(daily_log, key, daily_log_data[key])
+                    trip_ids = set(daily_log_data['trips'].values_list('id', flat=True))
+                    trips_changed = trip_ids != set(daily_log.trip.values_list('id', flat=True))
+
+                    if changed:
+                        daily_log.save(update_fields=changed)
+                    if trips_changed:
+                        daily_log.trip.set(trip_ids)
+                    if changed or trips_changed:
+                        publish_on_commit('daily_log', {'log': DailyLogSerializer(daily_log).data})
                     
             except ValueError:
                 pass
@@ -310,6 +511,7 @@ class DailyLogViewSet(viewsets.ModelViewSet):
             # Associate trips after creation
             daily_log = serializer.instance
             daily_log.trip.set(trips)
+            publish_on_commit('daily_log', {'log': serializer.data})
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
@@ -327,16 +529,35 @@ class DailyLogViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['GET'])
     def generate_report(self, request, pk=None):
         """Generate a detailed daily log report"""
-        today = datetime.now().date()
+        date_param = request.query_params.get('date')
+        try:
+            report_date = (
+                datetime.strptime(date_param, '%Y-%m-%d').date()
+                if date_param else datetime.now().date()
+            )
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Expected YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         try:
-            daily_logs = DailyLog.objects.filter(date=today).order_by('-id')
-            
-            if daily_logs.exists():
-                daily_log = daily_logs.first()
-                created = False
+            daily_log = DailyLog.objects.filter(date=report_date).order_by('-id').first()
+            archived = None if daily_log else archived_daily_logs(report_date, report_date)
+
+            if archived:
+                # Latest archived log for the day, read back from cold storage
+                daily_log = DailyLog(**{
+                    key: value for key, value in archived[-1].items() if key != 'trip'
+                })
+                trips = Trip.objects.filter(id__in=archived[-1]['trip'])
+            elif daily_log:
+                trips = daily_log.trip.all()
             else:
-                daily_log, created = DailyLog.objects.get_or_create(date=today)
+                # Nothing recorded for that day; report it empty without saving a row
+                daily_log = DailyLog(date=report_date)
+                trips = Trip.objects.none()
+
             report_data = {
                 'name': f'Daily Log for {daily_log.date}',
                 'date': daily_log.date,
@@ -358,7 +579,7 @@ class DailyLogViewSet(viewsets.ModelViewSet):
                     'end_time': trip.end_time,
                     'distance': trip.total_distance_km * 0.621371,  # Conversion to miles
                     'duration': trip.total_duration_hours
-                } for trip in daily_log.trip.all()]
+                } for trip in trips]
             }
             
             return Response(report_data)
@@ -367,4 +588,97 @@ class DailyLogViewSet(viewsets.ModelViewSet):
             return Response(
                 {"error": f"Failed to generate report: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+class RouteJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status and results of queued route calculations"""
+    queryset = RouteJob.objects.all().order_by('-created_at')
+    serializer_class = RouteJobSerializer
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return RouteJobSummarySerializer
+        return super().get_serializer_class()
+
+    def retrieve(self, request, *args, **kwargs):
+        data = self.get_serializer(self.get_object()).data
+        if data['result']:
+            data['result'] = route_payload_for(request, data['result'])
+        return Response(data)
+
+    @action(detail=False, methods=['GET'])
+    def metrics(self, request):
+        """Queue depth and job duration statistics"""
+        return Response(job_metrics())
+
+
+class LocationViewSet(viewsets.ModelViewSet):
+    """Registry of recurring depots and customers"""
+    queryset = Location.objects.all().order_by('id')
+    serializer_class = LocationSerializer
+
+    def handle_exception(self, exc):
+        if isinstance(exc, DuplicateLocation):
+            # Point callers at the existing location so they can reuse it
+            return Response(
+                {"error": str(exc), "existing_location_id": exc.location_id},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().handle_exception(exc)
+
+    def perform_update(self, serializer):
+        old_coord_key = serializer.instance.coord_key
+        location = serializer.save()
+        if location.coord_key != old_coord_key:
+            # Stored pairs were measured from the old position
+            location_id = location.id
+            transaction.on_commit(lambda: get_matrix_store().forget(location_id))
+
+    def perform_destroy(self, instance):
+        location_id = instance.id
+        instance.delete()
+        transaction.on_commit(lambda: get_matrix_store().forget(location_id))
+
+    @action(detail=False, methods=['GET'])
+    def distance(self, request):
+        """Stored duration/distance between two registered locations"""
+        try:
+            origin = int(request.query_params['origin'])
+            destination = int(request.query_params['destination'])
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "origin and destination location ids are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if origin < 1 or destination < 1:
+            return Response(
+                {"error": "Location ids must be positive"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        pair = get_matrix_store().get(origin, destination)
+        if pair is None:
+            return Response(
+                {"error": "Distance between these locations is not known yet"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        duration, distance = pair
+        return Response({
+            'origin': origin,
+            'destination': destination,
+            'duration_hours': duration / 3600 if duration != float('inf') else None,
+            'distance_km': distance / 1000 if distance != float('inf') else None,
+            'routable': duration != float('inf'),
+        })
+
+
+
+def event_stream(request):
+    """
+    /api/events/ is answered by the ASGI entry point (see events.sse_application);
+    this view is only reached under WSGI, which cannot hold streams open.
+    """
+    return JsonResponse(
+        {"error": "Event streams are only served by the ASGI application"},
+        status=status.HTTP_501_NOT_IMPLEMENTED
+    )
@@ -3,6 +3,7 @@ import * as d3 from "d3";
 import * as Plot from "@observablehq/plot";
 import axios from "axios";
 import "./DailyLogSheet.css";
+import useEventStream from "./useEventStream";
 
 const BASE_URL = "https://gleaming-compassion-production.up.railway.app";
 
@@ -59,6 +60,51 @@ const DailyLogSheet = () => {
     fetchDailyLog();
   }, []);
 
+  // Keep the sheet current from server events instead of refetching
+  const applyStatusEvent = ({ log, closed_log: closedLog }) => {
+    setData((prevData) => {
+      const updated = prevData
+        .filter((d) => d.id !== log.id)
+        .map((d) =>
+          closedLog && d.id === closedLog.id
+            ? { ...d, end_time: closedLog.end_time }
+            : d
+        );
+      const time = new Date(log.time);
+      if (time.toDateString() === new Date().toDateString()) {
+        updated.push({ ...log, time, status: formatStatus(log.status) });
+      }
+      return updated.sort((a, b) => a.time - b.time);
+    });
+  };
+
+  const applyDailyLogEvent = ({ log }) => {
+    if (!dailyLog || String(dailyLog.date) !== log.date) return;
+    // Trip details are not in the event, so reload the report if they changed
+    if (log.trip.length !== (dailyLog.trips || []).length) {
+      fetchDailyLog();
+      return;
+    }
+    setDailyLog({
+      ...dailyLog,
+      driving_hours: log.driving_hours,
+      on_duty_hours: log.on_duty_hours,
+      off_duty_hours: log.off_duty_hours,
+      sleeper_berth_hours: log.sleeper_berth_hours,
+      total_miles: log.total_miles,
+      cumulative_mileage: log.cumulative_mileage,
+    });
+  };
+
+  useEventStream(
+    `${BASE_URL}/api/events/`,
+    { status: applyStatusEvent, daily_log: applyDailyLogEvent },
+    () => {
+      fetchStatusData();
+      fetchDailyLog();
+    }
+  );
+
   // Render the ELD plot
   useEffect(() => {
     if (!plotRef.current) return;
@@ -4,6 +4,7 @@ import * as Plot from "@observablehq/plot";
 import axios from "axios";
 import "./ELDLogger.css";
 import DailyLogSheet from "./DailyLogSheet";
+import useEventStream from "./useEventStream";
 import html2canvas from "html2canvas";
 import jsPDF from "jspdf";
 
@@ -60,6 +61,40 @@ const ELDStatusLogger = () => {
     fetchData();
   }, []);
 
+  // Apply a status change pushed by the server instead of refetching the list
+  const applyStatusEvent = ({ log, closed_log: closedLog }) => {
+    const [entry] = resolveData([log]);
+    setData((prevData) => {
+      const updated = prevData
+        // Drop the optimistic entry this log confirms, and any older copy of it
+        .filter(
+          (d) =>
+            d.id !== log.id &&
+            !(
+              d.id === undefined &&
+              d.status === entry.status &&
+              d.time.getTime() === entry.time.getTime()
+            )
+        )
+        .map((d) =>
+          closedLog && d.id === closedLog.id
+            ? { ...d, end_time: closedLog.end_time }
+            : d
+        );
+      // The list only shows today's logs
+      if (entry.time.toDateString() === new Date().toDateString()) {
+        updated.push(entry);
+      }
+      return updated.sort((a, b) => a.time - b.time);
+    });
+  };
+
+  const streaming = useEventStream(
+    `${BASE_URL}/api/events/`,
+    { status: applyStatusEvent },
+    fetchData
+  );
+
   useEffect(() => {
     if (!plotRef.current) return;
 
@@ -196,10 +231,9 @@ const ELDStatusLogger = () => {
         },
       ]);
 
-      const response = await axios.post(
-        `${BASE_URL}/api/status-logs/`,
-        optimisticEntry
-      );
+      await axios.post(`${BASE_URL}/api/status-logs/`, optimisticEntry);
+      // Without the event stream, reload to pick up the saved log
+      if (!streaming) fetchData();
     } catch (error) {
       console.error("Error updating status:", error);
       setError("Failed to update status. Please try again.");
@@ -0,0 +1,47 @@
+import { useEffect, useRef, useState } from "react";
+
+// Subscribe to the server-sent events at /api/events/ for the topics in
+// `handlers` ({ status: (data) => ..., daily_log: (data) => ... }).
+// Returns whether the stream is live, so callers can fall back to refetching
+// when it is not (the API answers 501 when served over WSGI).
+// `onReconnect` runs when the stream comes back after dropping, to catch up
+// on events missed in between.
+const useEventStream = (url, handlers, onReconnect) => {
+  const handlersRef = useRef(handlers);
+  const onReconnectRef = useRef(onReconnect);
+  const [connected, setConnected] = useState(false);
+
+  useEffect(() => {
+    handlersRef.current = handlers;
+    onReconnectRef.current = onReconnect;
+  });
+
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return undefined;
+
+    const topics = Object.keys(handlersRef.current);
+    const source = new EventSource(`${url}?topics=${topics.join(",")}`);
+    let openedBefore = false;
+
+    source.onopen = () => {
+      setConnected(true);
+      if (openedBefore) onReconnectRef.current?.();
+      openedBefore = true;
+    };
+    // The browser retries dropped streams by itself; a refused stream
+    // (wrong content type or an error status) ends up CLOSED instead.
+    source.onerror = () => setConnected(false);
+
+    topics.forEach((topic) => {
+      source.addEventListener(topic, (event) => {
+        handlersRef.current[topic]?.(JSON.parse(event.data));
+      });
+    });
+
+    return () => source.close();
+  }, [url]);
+
+  return connected;
+};
+
+export default useEventStream;